@@ -13,7 +13,6 @@ Functions:
 
 Cache Key Patterns:
     - media_permission:{user_id}:{media_uid}[:{additional_data_hash}]
-    - elevated_access:{user_id}:{media_uid}
 """
 
 import hashlib
@@ -36,7 +35,6 @@ CACHE_VERSION = getattr(settings, "PERMISSION_CACHE_VERSION", 1)
 
 # Cache key templates for better performance
 PERMISSION_KEY_TEMPLATE = f"{CACHE_KEY_PREFIX}:media_permission:{{user_id}}:{{media_uid}}"
-ELEVATED_ACCESS_KEY_TEMPLATE = f"{CACHE_KEY_PREFIX}:elevated_access:{{user_id}}:{{media_uid}}"
 RESTRICTED_KEY_TEMPLATE = f"{CACHE_KEY_PREFIX}:media_permission:{{user_id}}:{{media_uid}}:{{data_hash}}"
 
 
@@ -46,7 +44,9 @@ def _normalize_media_uid(media_uid: str | Any) -> str:
     return str(media_uid)
 
 
-def get_permission_cache_key(user_id: int | str, media_uid: str, additional_data: str | None = None) -> str:
+def get_permission_cache_key(
+    user_id: int | str, media_uid: str, additional_data: str | None = None, data_hash: str | None = None
+) -> str:
     """
     Generate a cache key for user permission checks.
 
@@ -54,12 +54,16 @@ def get_permission_cache_key(user_id: int | str, media_uid: str, additional_data
         user_id: User ID (can be 'anonymous' for non-authenticated users)
         media_uid: Media UID string
         additional_data: Optional additional data to include in key (e.g., password hash)
+        data_hash: Optional pre-computed short digest, used as-is instead of hashing additional_data
 
     Returns:
         str: Cache key for the permission check
     """
     media_uid = _normalize_media_uid(media_uid)
 
+    if data_hash:
+        return RESTRICTED_KEY_TEMPLATE.format(user_id=user_id, media_uid=media_uid, data_hash=data_hash)
+
     if additional_data:
         # Use SHA-256 for better security and consistency, truncated for cache efficiency
         data_hash = hashlib.sha256(additional_data.encode("utf-8")).hexdigest()[:12]
@@ -68,21 +72,6 @@ def get_permission_cache_key(user_id: int | str, media_uid: str, additional_data
     return PERMISSION_KEY_TEMPLATE.format(user_id=user_id, media_uid=media_uid)
 
 
-def get_elevated_access_cache_key(user_id: int, media_uid: str) -> str:
-    """
-    Generate a cache key for elevated access checks.
-
-    Args:
-        user_id: User ID
-        media_uid: Media UID string
-
-    Returns:
-        str: Cache key for the elevated access check
-    """
-    media_uid = _normalize_media_uid(media_uid)
-    return ELEVATED_ACCESS_KEY_TEMPLATE.format(user_id=user_id, media_uid=media_uid)
-
-
 def get_cached_permission(cache_key: str) -> bool | None:
     """
     Get cached permission result with enhanced error handling.
@@ -191,26 +180,15 @@ def clear_media_permission_cache(media_uid: str | Any, user_id: int | None = Non
     media_uid = _normalize_media_uid(media_uid)
     try:
         if user_id:
-            # Clear specific user's cache (base + restricted + elevated)
+            # Clear specific user's cache (base + restricted)
             if hasattr(cache, "delete_pattern"):
-                patterns = [
-                    f"{CACHE_KEY_PREFIX}:media_permission:{user_id}:{media_uid}*",
-                    f"{CACHE_KEY_PREFIX}:elevated_access:{user_id}:{media_uid}",
-                ]
-                total_deleted = 0
-                for pattern in patterns:
-                    deleted_count = cache.delete_pattern(pattern, version=CACHE_VERSION)
-                    total_deleted += deleted_count
-                    logger.debug(f"Cleared {deleted_count} cache entries for pattern: {pattern}")
-                logger.info(f"Cleared {total_deleted} cache entries for user {user_id}, media {media_uid}")
+                pattern = f"{CACHE_KEY_PREFIX}:media_permission:{user_id}:{media_uid}*"
+                deleted_count = cache.delete_pattern(pattern, version=CACHE_VERSION)
+                logger.info(f"Cleared {deleted_count} cache entries for user {user_id}, media {media_uid}")
                 return True
             else:
-                # Fallback clears known keys; restricted variants cannot be enumerated
-                cache_keys = [
-                    get_permission_cache_key(user_id, media_uid),
-                    get_elevated_access_cache_key(user_id, media_uid),
-                ]
-                cache.delete_many(cache_keys, version=CACHE_VERSION)
+                # Fallback clears the known key; restricted variants cannot be enumerated
+                cache.delete(get_permission_cache_key(user_id, media_uid), version=CACHE_VERSION)
                 logger.warning(
                     "delete_pattern not available; restricted permission keys may remain for "
                     f"user {user_id}, media {media_uid}"
@@ -223,16 +201,9 @@ def clear_media_permission_cache(media_uid: str | Any, user_id: int | None = Non
             try:
                 # Try to use delete_pattern if available (django-redis)
                 if hasattr(cache, "delete_pattern"):
-                    patterns = [
-                        f"{CACHE_KEY_PREFIX}:media_permission:*:{media_uid}*",
-                        f"{CACHE_KEY_PREFIX}:elevated_access:*:{media_uid}",
-                    ]
-                    total_deleted = 0
-                    for pattern in patterns:
-                        deleted_count = cache.delete_pattern(pattern, version=CACHE_VERSION)
-                        total_deleted += deleted_count
-                        logger.debug(f"Cleared {deleted_count} cache entries for pattern: {pattern}")
-                    logger.info(f"Cleared {total_deleted} total cache entries for media {media_uid}")
+                    pattern = f"{CACHE_KEY_PREFIX}:media_permission:*:{media_uid}*"
+                    deleted_count = cache.delete_pattern(pattern, version=CACHE_VERSION)
+                    logger.info(f"Cleared {deleted_count} total cache entries for media {media_uid}")
                     return True
                 else:
                     logger.warning("delete_pattern not available, cannot clear all user caches for media")
@@ -258,16 +229,9 @@ def clear_user_permission_cache(user_id: int) -> bool:
     """
     try:
         if hasattr(cache, "delete_pattern"):
-            patterns = [
-                f"{CACHE_KEY_PREFIX}:media_permission:{user_id}:*",
-                f"{CACHE_KEY_PREFIX}:elevated_access:{user_id}:*",
-            ]
-            total_deleted = 0
-            for pattern in patterns:
-                deleted_count = cache.delete_pattern(pattern, version=CACHE_VERSION)
-                total_deleted += deleted_count
-                logger.debug(f"Cleared {deleted_count} cache entries for user {user_id} with pattern: {pattern}")
-            logger.info(f"Cleared {total_deleted} total cache entries for user {user_id}")
+            pattern = f"{CACHE_KEY_PREFIX}:media_permission:{user_id}:*"
+            deleted_count = cache.delete_pattern(pattern, version=CACHE_VERSION)
+            logger.info(f"Cleared {deleted_count} total cache entries for user {user_id}")
             return True
         else:
             logger.warning("delete_pattern not available, cannot clear all caches for user")
@@ -286,17 +250,8 @@ def invalidate_all_permission_cache() -> int:
         int: Number of cache entries cleared
     """
     try:
-        patterns = [
-            f"{CACHE_KEY_PREFIX}:media_permission:*",
-            f"{CACHE_KEY_PREFIX}:elevated_access:*",
-        ]
-
-        total_cleared = 0
         if hasattr(cache, "delete_pattern"):
-            for pattern in patterns:
-                count = cache.delete_pattern(pattern, version=CACHE_VERSION)
-                total_cleared += count
-                logger.info(f"Cleared {count} entries for pattern: {pattern}")
+            total_cleared = cache.delete_pattern(f"{CACHE_KEY_PREFIX}:media_permission:*", version=CACHE_VERSION)
             logger.info(f"Total permission cache entries cleared: {total_cleared}")
             return total_cleared
         else:
@@ -29,6 +29,7 @@ from .permissions import (
     IsMediacmsEditor,
     IsUploadMediaUser,
 )
+from .secure_media_views import invalidate_media_path_cache
 from .serializers import CommentSerializer, ManageCommunityImpactSerializer, ManageUploadSerializer, MediaSerializer
 
 VALID_MEDIA_STATES = ["private", "public", "restricted", "unlisted"]
@@ -211,13 +212,19 @@ class MyUploadsBulkState(APIView):
 
         with transaction.atomic():
             qs = Media.objects.select_for_update().filter(friendly_token__in=tokens, user=request.user)
-            if qs.count() != len(tokens):
+            media_ids = list(qs.values_list("id", flat=True))
+            if len(media_ids) != len(tokens):
                 return Response(
                     {"detail": "one or more tokens not found or not owned by you"},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
             updated = qs.update(state=new_state)
+
+        # update() skips post_save, so drop the secure-serving path entries
+        # (which may snapshot a public state) here
+        for media_id in media_ids:
+            invalidate_media_path_cache(media_id)
         return Response({"updated": updated}, status=status.HTTP_200_OK)
 
 
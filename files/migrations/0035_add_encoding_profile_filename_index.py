@@ -0,0 +1,17 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("files", "0034_relative_hls_file"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="encoding",
+            index=models.Index(
+                fields=["profile", "filename"],
+                name="encoding_profile_filename_idx",
+            ),
+        ),
+    ]
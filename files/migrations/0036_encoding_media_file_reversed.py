@@ -0,0 +1,28 @@
+from django.db import migrations, models
+from django.db.models.functions import Reverse
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("files", "0035_add_encoding_profile_filename_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="encoding",
+            name="media_file_reversed",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=Reverse("media_file"),
+                output_field=models.CharField(max_length=500),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="encoding",
+            index=models.Index(
+                fields=["media_file_reversed"],
+                name="encoding_media_file_rev_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
+        ),
+    ]
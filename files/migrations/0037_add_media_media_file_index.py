@@ -0,0 +1,14 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("files", "0036_encoding_media_file_reversed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="media",
+            index=models.Index(fields=["media_file"], name="idx_media_media_file"),
+        ),
+    ]
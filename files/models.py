@@ -18,6 +18,7 @@ from django.core.files import File
 from django.core.validators import RegexValidator
 from django.db import DatabaseError, connection, models
 from django.db.models import Q
+from django.db.models.functions import Reverse
 from django.db.models.signals import (
     m2m_changed,
     post_delete,
@@ -405,6 +406,8 @@ class Media(models.Model):
             models.Index(fields=["uploaded_thumbnail"], name="idx_media_uploaded_thumb"),
             models.Index(fields=["uploaded_poster"], name="idx_media_uploaded_poster"),
             models.Index(fields=["sprites"], name="idx_media_sprites"),
+            # Exact media_file lookup for original/user/ paths whose filename column is unset
+            models.Index(fields=["media_file"], name="idx_media_media_file"),
             # Support MyUploadsList: filter user, optional state/encoding_status, order -add_date.
             # Created by migration 0017_add_my_uploads_indexes; declared here so the model
             # matches the DB and makemigrations --check stays green.
@@ -1550,6 +1553,13 @@ class Encoding(models.Model):
         db_index=True,
         help_text="Whether the Celery task has been dispatched. False when deferred by rate limiting.",
     )
+    # media_file spelled backwards, so suffix matches become indexable prefix matches:
+    # filter(media_file_reversed__startswith=filename[::-1]) instead of media_file__endswith
+    media_file_reversed = models.GeneratedField(
+        expression=Reverse("media_file"),
+        output_field=models.CharField(max_length=500),
+        db_persist=True,
+    )
 
     class Meta:
         indexes = [
@@ -1557,6 +1567,16 @@ class Encoding(models.Model):
                 fields=["status", "task_dispatched", "add_date"],
                 name="encoding_drain_idx",
             ),
+            # Secure media resolves encoded/{profile_id}/{username}/{filename} paths by profile + filename
+            models.Index(
+                fields=["profile", "filename"],
+                name="encoding_profile_filename_idx",
+            ),
+            models.Index(
+                fields=["media_file_reversed"],
+                name="encoding_media_file_rev_idx",
+                opclasses=["varchar_pattern_ops"],
+            ),
         ]
 
     @property
@@ -2555,6 +2575,26 @@ def encoding_storage_usage_delete(sender, instance, **kwargs):
     _schedule_storage_usage_refresh_for_media(instance.media_id)
 
 
+@receiver(post_save, sender=Encoding)
+@receiver(post_delete, sender=Encoding)
+def encoding_media_path_cache_invalidate(sender, instance, update_fields=None, **kwargs):
+    # Cached file path → media resolutions for secure file serving may point at this encoding
+    if update_fields is not None and not {"media_file", "filename", "media"}.intersection(update_fields):
+        return
+    invalidate_func = get_invalidate_media_path_cache()
+    invalidate_func(instance.media_id)
+
+
+@receiver(post_save, sender=Subtitle)
+@receiver(post_delete, sender=Subtitle)
+def subtitle_media_path_cache_invalidate(sender, instance, update_fields=None, **kwargs):
+    # Cached file path → media resolutions for secure file serving may point at this subtitle
+    if update_fields is not None and not {"subtitle_file", "media"}.intersection(update_fields):
+        return
+    invalidate_func = get_invalidate_media_path_cache()
+    invalidate_func(instance.media_id)
+
+
 @receiver(post_save, sender=Subtitle)
 def subtitle_storage_usage_save(sender, instance, update_fields=None, **kwargs):
     if update_fields is not None and "subtitle_file" not in set(update_fields):
@@ -3,27 +3,29 @@ import logging
 import mimetypes
 import os
 import re
+import stat
+from functools import lru_cache
 from urllib.parse import quote, unquote
 
 from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Q
-from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden
-from django.utils.decorators import method_decorator
+from django.db.models import Case, Exists, F, IntegerField, OuterRef, Q, When
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from django.views import View
-from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_http_methods
 
 from .cache_utils import (
     PERMISSION_CACHE_TIMEOUT,
     RESTRICTED_MEDIA_CACHE_TIMEOUT,
     get_cached_permission,
-    get_elevated_access_cache_key,
     get_permission_cache_key,
     set_cached_permission,
 )
 from .methods import is_curator, is_mediacms_editor, is_mediacms_manager
 from .models import Encoding, Media, Subtitle
+from .tasks import backfill_encoding_filename
 
 logger = logging.getLogger(__name__)
 
@@ -32,20 +34,14 @@ logger = logging.getLogger(__name__)
 
 
 def user_has_elevated_access(user, media: Media) -> bool:
-    """Check if user is owner, editor, or manager with caching. Assumes user is authenticated."""
+    """Check if user is owner, editor, or manager. Assumes user is authenticated."""
     if not user.is_authenticated:
         return False
 
-    cache_key = get_elevated_access_cache_key(user.id, media.uid)
-
-    cached_result = get_cached_permission(cache_key)
-    if cached_result is not None:
-        return cached_result
-
-    result = user == media.user or is_mediacms_editor(user) or is_mediacms_manager(user) or is_curator(user)
-
-    set_cached_permission(cache_key, result)
-    return result
+    # Ownership and roles are read from columns already loaded on the media and
+    # user rows, so this needs no query and no cache round trip. Compare on the
+    # FK column so callers that fetched media without the user join don't trigger a query.
+    return media.user_id == user.id or is_mediacms_editor(user) or is_mediacms_manager(user) or is_curator(user)
 
 
 def _calculate_access_permission(request, media: Media) -> bool:
@@ -75,21 +71,25 @@ def _calculate_access_permission(request, media: Media) -> bool:
 
 def check_media_access_permission(request, media: Media) -> bool:
     """Check if the user has permission to access the media, with caching."""
-    user = request.user
-    user_id = user.id if user.is_authenticated else "anonymous"
-
+    # Decided before touching request.user, which is lazy and would otherwise
+    # load the session and user row for the common public streaming case
     if media.state in ("public", "unlisted"):
         return True
 
-    additional_data = None
+    user = request.user
+    user_id = user.id if user.is_authenticated else "anonymous"
+
+    token_hash = None
     if media.state == "restricted":
         query_token = request.GET.get("token")
         session_token = request.session.get(f"media_token_{media.friendly_token}")
         token_material = query_token or session_token or "no_token"
+        # Already a short digest, so it goes into the key as-is rather than being hashed again
         token_hash = hashlib.blake2b(token_material.encode("utf-8"), digest_size=6).hexdigest()
-        additional_data = f"restricted:{token_hash}"
 
-    cache_key = get_permission_cache_key(user_id, media.uid, additional_data)
+    # The key is scoped to the user and media (plus token material), never the
+    # requested file, so every HLS segment/rendition of a media shares one entry.
+    cache_key = get_permission_cache_key(user_id, media.uid, data_hash=token_hash)
 
     cached_result = get_cached_permission(cache_key)
     if cached_result is not None:
@@ -98,7 +98,7 @@ def check_media_access_permission(request, media: Media) -> bool:
     result = _calculate_access_permission(request, media)
 
     cache_timeout = PERMISSION_CACHE_TIMEOUT
-    if media.state == "restricted" and additional_data:
+    if media.state == "restricted" and token_hash:
         cache_timeout = RESTRICTED_MEDIA_CACHE_TIMEOUT
 
     set_cached_permission(cache_key, result, cache_timeout)
@@ -108,13 +108,41 @@ def check_media_access_permission(request, media: Media) -> bool:
 # Configuration constants
 CACHE_CONTROL_MAX_AGE = 604800  # 1 week
 MEDIA_PATH_CACHE_TIMEOUT = 300  # 5 minutes for file path → Media ID mapping
+PUBLIC_MEDIA_CACHE_TIMEOUT = 60  # Shorter, for HLS entries that also carry a public/unlisted Media snapshot
 MEDIA_PATH_CACHE_PREFIX = "cinemata:media_path"
 MEDIA_PATH_REVERSE_PREFIX = "cinemata:media_path:reverse"  # Reverse mapping: media_id → set of cache keys
+RANGE_CHUNK_SIZE = 8 * 1024 * 1024  # Read size when streaming byte ranges in direct Django serving
+MEDIA_PATH_INVALIDATION_BATCH_SIZE = 200  # SSCAN count hint and delete batch size during invalidation
+MAX_MEDIA_PATH_LENGTH = 1024  # Longer than any stored media path (hls_file allows 1000 with MEDIA_ROOT)
+
+# Columns loaded when re-fetching a Media by cached ID: what the serving path reads
+# (state, tokens, owner FK, thumbnail fields) plus the fields Media.__init__ snapshots,
+# so no deferred-field query fires on the hot path.
+SECURE_MEDIA_FIELDS = (
+    "id",
+    "uid",
+    "friendly_token",
+    "state",
+    "user",
+    "filename",
+    "media_file",
+    "thumbnail",
+    "poster",
+    "uploaded_thumbnail",
+    "uploaded_poster",
+    "sprites",
+    "thumbnail_time",
+    "password",
+    "is_encrypted",
+)
+# The same columns in model order, as Model.from_db expects when rebuilding a cached snapshot
+_SECURE_MEDIA_MODEL_FIELDS = tuple(field for field in Media._meta.concrete_fields if field.name in SECURE_MEDIA_FIELDS)
 
 # Paths that are always public (no authorization needed)
 # Note: User-specific media thumbnails (original/thumbnails/user/) are NOT public
 # and require authorization for private/restricted media
-PUBLIC_MEDIA_PATHS = [
+# A tuple so it can be passed straight to str.startswith()
+PUBLIC_MEDIA_PATHS = (
     "userlogos/",
     "logos/",
     "favicons/",
@@ -126,7 +154,77 @@ PUBLIC_MEDIA_PATHS = [
     "original/topics/",
     # Composite thumbnails for playlist social sharing
     "composite_thumbnails/",
-]
+)
+
+# Everything _is_public_media_file serves without a lookup, including user logos
+# under original/, as one tuple for a single str.startswith() call
+PUBLIC_FILE_PREFIXES = (*PUBLIC_MEDIA_PATHS, "original/userlogos/")
+
+# Prefixes accepted by _is_valid_file_path: allowed video/media prefixes combined with
+# public media paths and their "original/" variants, so they are not incorrectly blocked.
+# Built once as a tuple for a single str.startswith() call.
+ALLOWED_MEDIA_PATHS = tuple(
+    dict.fromkeys(
+        (
+            # Video-specific paths (with videos/ prefix)
+            "videos/media/",
+            "videos/encoded/",
+            "videos/subtitles/",
+            "other_media/",
+            # Standalone media paths (critical for video processing)
+            "hls/",  # HLS streaming files (REQUIRED for playback)
+            "encoded/",  # Encoded video files (REQUIRED for transcoding)
+            "original/",  # Original media files (REQUIRED for various operations)
+            *PUBLIC_MEDIA_PATHS,
+            # Some public assets like thumbnails can also be in an 'original' directory
+            *(f"original/{public_path}" for public_path in PUBLIC_MEDIA_PATHS),
+        )
+    )
+)
+
+# Per-user directories whose files belong to a specific Media object and
+# always require authorization:
+MEDIA_ASSOCIATED_PATHS = (
+    # Media thumbnails: original/thumbnails/user/{username}/{filename}
+    "original/thumbnails/user/",
+    # Subtitle files: original/subtitles/user/{username}/{filename}
+    # Subtitles contain transcripts of video content and must be protected
+    "original/subtitles/user/",
+)
+
+# Prefixes _is_non_video_file never bypasses: media-associated files plus HLS
+# streaming content, as one tuple for a single str.startswith() call
+NEVER_BYPASSED_PREFIXES = (*MEDIA_ASSOCIATED_PATHS, "hls/")
+
+# Common video file extensions; these never bypass authorization in _is_non_video_file
+VIDEO_EXTENSIONS = frozenset(
+    {
+        ".mp4",
+        ".avi",
+        ".mkv",
+        ".mov",
+        ".wmv",
+        ".flv",
+        ".webm",
+        ".m4v",
+        ".3gp",
+        ".ogv",
+        ".asf",
+        ".rm",
+        ".rmvb",
+        ".vob",
+        ".mpg",
+        ".mpeg",
+        ".mp2",
+        ".mpe",
+        ".mpv",
+        ".m2v",
+        ".m4p",
+        ".f4v",
+        ".ts",
+        ".m3u8",  # Include HLS formats
+    }
+)
 
 # Security headers for different content types
 SECURITY_HEADERS = {
@@ -152,8 +250,9 @@ Permission Caching Strategy:
 This module implements Redis caching for user permission checks to improve performance
 when serving secure media files. The caching strategy includes:
 
-1. Elevated Access Caching: Caches whether a user has owner/editor/manager permissions
-   Cache key format: "elevated_access:{user_id}:{media_uid}"
+1. Elevated access (owner/editor/manager/curator) is not cached: it is computed
+   from fields already loaded on the media and user rows, which is cheaper than
+   a Redis round trip.
 
 2. Permission Result Caching: Caches the final permission decision
    Cache key format: "media_permission:{user_id}:{media_uid}[:{additional_data_hash}]"
@@ -166,6 +265,8 @@ when serving secure media files. The caching strategy includes:
    - Specific user/media combinations can be cleared
    - Pattern-based clearing for all users (if django-redis is available)
    - Automatic invalidation when media permissions change (via models.py)
+   - HLS path entries for public/unlisted media also hold the Media's serving
+     column values (1 minute), cleared with the rest of the media's path entries
 
 5. Graceful degradation:
    - If cache fails, permission checks continue without caching
@@ -199,13 +300,14 @@ Security Considerations:
 def get_media_path_cache_key(file_path: str) -> str:
     """
     Generate cache key for file path → Media ID mapping.
-    Uses full SHA-256 hash for strong collision resistance.
+    Uses a 128-bit BLAKE2b digest for collision resistance.
 
-    Cache key format: cinemata:media_path:{sha256_hexdigest}
-    SHA-256 provides 256 bits of entropy (vs 64 bits from truncated MD5),
-    making collisions astronomically unlikely even at massive scale.
+    Cache key format: cinemata:media_path:{blake2b_128_hexdigest}
+    The hash only needs collision resistance (not preimage resistance), and
+    BLAKE2b is faster than SHA-256 in CPython. 128 bits keeps collisions
+    astronomically unlikely even at massive scale.
     """
-    path_hash = hashlib.sha256(file_path.encode("utf-8")).hexdigest()
+    path_hash = hashlib.blake2b(file_path.encode("utf-8"), digest_size=16).hexdigest()
     return f"{MEDIA_PATH_CACHE_PREFIX}:{path_hash}"
 
 
@@ -217,38 +319,75 @@ def get_reverse_mapping_key(media_id: int) -> str:
     return f"{MEDIA_PATH_REVERSE_PREFIX}:{media_id}"
 
 
-def get_cached_media_id(file_path: str) -> int | None:
-    """Get cached Media ID for a file path."""
+def _media_snapshot_values(media: Media) -> tuple:
+    """Column values of SECURE_MEDIA_FIELDS as plain Python values, so the cache never pickles a model."""
+    return tuple(field.get_prep_value(field.value_from_object(media)) for field in _SECURE_MEDIA_MODEL_FIELDS)
+
+
+def _media_from_snapshot_values(values: tuple) -> Media:
+    """Rebuild a Media loaded with only SECURE_MEDIA_FIELDS, as .only() would."""
+    return Media.from_db(None, [field.attname for field in _SECURE_MEDIA_MODEL_FIELDS], list(values))
+
+
+def get_cached_media_entry(file_path: str) -> tuple[int | None, str | None, Media | None]:
+    """
+    Get the cached (Media ID, actual file path, public Media) resolution for a file path.
+
+    The actual file path is only set when the lookup resolved to a different
+    path on disk (ownership transfers); otherwise it is None. The public Media is
+    only present on HLS folder entries for public/unlisted media; it is rebuilt
+    from cached column values rather than unpickled.
+    """
     try:
         cache_key = get_media_path_cache_key(file_path)
-        media_id = cache.get(cache_key)
-        if media_id:
-            logger.debug(f"Cache HIT for media path: {file_path}")
-            return media_id
-        logger.debug(f"Cache MISS for media path: {file_path}")
-        return None
+        entry = cache.get(cache_key)
+        if entry:
+            logger.debug("Cache HIT for media path: %s", file_path)
+            # Entries written before the actual path was cached hold a bare media ID
+            if not isinstance(entry, tuple):
+                return (entry, None, None)
+            if len(entry) == 2:
+                return (*entry, None)
+            media_id, actual_file_path, snapshot_values = entry
+            public_media = _media_from_snapshot_values(snapshot_values) if snapshot_values else None
+            return (media_id, actual_file_path, public_media)
+        logger.debug("Cache MISS for media path: %s", file_path)
+        return (None, None, None)
     except Exception as e:
         logger.warning(f"Failed to get cached media ID for {file_path}: {e}")
-        return None
+        return (None, None, None)
+
+
+def get_cached_media_id(file_path: str) -> int | None:
+    """Get cached Media ID for a file path."""
+    return get_cached_media_entry(file_path)[0]
 
 
-def set_cached_media_id(file_path: str, media_id: int) -> bool:
+def set_cached_media_id(
+    file_path: str, media_id: int, actual_file_path: str | None = None, public_media: Media | None = None
+) -> bool:
     """
     Cache Media ID for a file path and maintain reverse mapping for invalidation.
 
     This function:
-    1. Caches the file_path → media_id mapping
+    1. Caches the file_path → (media_id, actual_file_path, public_media values) mapping
     2. Adds the cache key to a reverse mapping set for the media_id
 
     The reverse mapping allows efficient invalidation of all cached paths
-    when a media object is deleted or its permissions change.
+    when a media object is deleted or its permissions change. Entries carrying
+    a public_media snapshot use the shorter PUBLIC_MEDIA_CACHE_TIMEOUT; only its
+    SECURE_MEDIA_FIELDS column values are stored, never the pickled model.
     """
     try:
         cache_key = get_media_path_cache_key(file_path)
         reverse_key = get_reverse_mapping_key(media_id)
 
-        # Store the forward mapping: file_path → media_id
-        cache.set(cache_key, media_id, MEDIA_PATH_CACHE_TIMEOUT)
+        # Store the forward mapping: file_path → (media_id, actual_file_path, public_media values)
+        if public_media is None:
+            cache.set(cache_key, (media_id, actual_file_path, None), MEDIA_PATH_CACHE_TIMEOUT)
+        else:
+            snapshot_values = _media_snapshot_values(public_media)
+            cache.set(cache_key, (media_id, actual_file_path, snapshot_values), PUBLIC_MEDIA_CACHE_TIMEOUT)
 
         # Add to reverse mapping set: media_id → {cache_key1, cache_key2, ...}
         # Use a Redis set to track all cache keys for this media
@@ -267,13 +406,67 @@ def set_cached_media_id(file_path: str, media_id: int) -> bool:
             existing_keys.add(cache_key)
             cache.set(reverse_key, existing_keys, MEDIA_PATH_CACHE_TIMEOUT)
 
-        logger.debug(f"Cached media ID {media_id} for path: {file_path}")
+        logger.debug("Cached media ID %s for path: %s", media_id, file_path)
         return True
     except Exception as e:
         logger.warning(f"Failed to cache media ID for {file_path}: {e}")
         return False
 
 
+@lru_cache(maxsize=4096)
+def get_internal_media_uri(file_path: str) -> str:
+    """
+    Map a media file path to the Nginx internal location used for X-Accel-Redirect.
+
+    Memoized because HLS playback requests the same segment paths over and over,
+    and quote() scans the path in pure Python.
+    """
+    if file_path.startswith("original/"):
+        unencoded = f"/internal/media/original/{file_path[len('original/') :]}"
+    else:
+        unencoded = f"/internal/media/{file_path}"
+    # Ensure header value is a valid URI (encode spaces/non-ASCII, keep slashes)
+    return quote(unencoded, safe="/:")
+
+
+def get_file_extension(file_path: str) -> str:
+    """
+    Return the lowercased extension of a slash-separated media path.
+
+    Same result as os.path.splitext(file_path)[1].lower() (dots in directory
+    names and leading dots of the basename are ignored), but with two C-level
+    rpartition calls instead of posixpath's pure-Python scan.
+    """
+    stem, dot, ext = file_path.rpartition("/")[2].rpartition(".")
+    return f".{ext.lower()}" if dot and stem.strip(".") else ""
+
+
+@lru_cache(maxsize=4096)
+def _normalize_to_relative_cached(media_root: str, path: str) -> str:
+    """
+    Strip the MEDIA_ROOT prefix from a stored path (see SecureMediaView._normalize_to_relative).
+
+    Keyed on MEDIA_ROOT as well as the path, so overridden settings never see a
+    stale result; the same thumbnail/poster names recur on every request.
+    """
+    # Ensure consistent trailing slash for prefix matching
+    if not media_root.endswith("/"):
+        media_root = media_root + "/"
+    if path.startswith(media_root):
+        return path[len(media_root) :]
+    return path
+
+
+def _delete_cache_keys(cache_keys: list) -> int:
+    """Delete a batch of forward mapping cache keys in one round trip, returning the batch size."""
+    try:
+        cache.delete_many(cache_keys)
+    except Exception as e:
+        logger.warning(f"Failed to delete {len(cache_keys)} media path cache keys: {e}")
+        return 0
+    return len(cache_keys)
+
+
 def invalidate_media_path_cache(media_id: int) -> int:
     """
     Invalidate all cached file paths for a media object.
@@ -290,34 +483,34 @@ def invalidate_media_path_cache(media_id: int) -> int:
     try:
         reverse_key = get_reverse_mapping_key(media_id)
 
-        # Get all cache keys for this media from the reverse mapping
-        cache_keys = None
+        deleted_count = 0
         try:
-            # Try Redis SET operations first (smembers)
-            cache_keys = cache.smembers(reverse_key)
+            # Walk the Redis SET incrementally (SSCAN) and delete in batches,
+            # so a large reverse mapping never blocks Redis or is loaded in one go
+            batch = []
+            for cache_key in cache.sscan_iter(reverse_key, count=MEDIA_PATH_INVALIDATION_BATCH_SIZE):
+                batch.append(cache_key)
+                if len(batch) >= MEDIA_PATH_INVALIDATION_BATCH_SIZE:
+                    deleted_count += _delete_cache_keys(batch)
+                    batch = []
+            if batch:
+                deleted_count += _delete_cache_keys(batch)
         except AttributeError:
             # Fallback for non-Redis backends
             cache_keys = cache.get(reverse_key, set())
             if not isinstance(cache_keys, set):
                 cache_keys = set()
+            if cache_keys:
+                deleted_count = _delete_cache_keys(list(cache_keys))
 
-        if cache_keys:
-            # Delete all forward mapping cache keys
-            deleted_count = 0
-            for cache_key in cache_keys:
-                try:
-                    cache.delete(cache_key)
-                    deleted_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to delete cache key {cache_key}: {e}")
-
+        if deleted_count:
             # Delete the reverse mapping itself
             cache.delete(reverse_key)
 
             logger.info(f"Invalidated {deleted_count} cache entries for media {media_id}")
             return deleted_count
         else:
-            logger.debug(f"No cached paths found for media {media_id}")
+            logger.debug("No cached paths found for media %s", media_id)
             return 0
 
     except Exception as e:
@@ -335,7 +528,28 @@ class SecureMediaView(View):
     """
 
     # Path traversal protection
-    INVALID_PATH_PATTERNS = re.compile(r"\.\.|\\|\x00|[\x01-\x1f\x7f]")
+    # A single character class (control characters, DEL, backslash); ".." is checked
+    # separately as a substring so the regex has no alternation to try per position
+    INVALID_PATH_PATTERNS = re.compile(r"[\x00-\x1f\x7f\\]")
+    # Bound once so the per-request check skips the attribute lookup on the pattern
+    _find_invalid_path_chars = INVALID_PATH_PATTERNS.search
+
+    # Segment extraction for _get_media_from_path, one regex match per request
+    # instead of split("/") + length check. Like split(), trailing segments are ignored.
+    ORIGINAL_PATH_PATTERN = re.compile(r"original/user/([^/]*)/([^/]*)")  # username, filename
+    THUMBNAIL_PATH_PATTERN = re.compile(r"original/thumbnails/user/([^/]*)/([^/]*)")  # username, filename
+    SUBTITLE_PATH_PATTERN = re.compile(r"original/subtitles/user/([^/]*)/([^/]*)")  # username, filename
+    ENCODED_PATH_PATTERN = re.compile(r"encoded/([^/]*)/([^/]*)/([^/]*)")  # profile_id, username, filename
+    HLS_PATH_PATTERN = re.compile(r"hls/([^/]*)/")  # folder name
+    # UID check for HLS folders; the length bounds are part of the pattern
+    UID_PATTERN = re.compile(r"[0-9a-fA-F]{8,64}")
+    _match_uid = UID_PATTERN.fullmatch
+
+    # Single byte range for direct serving: bytes=start-end, bytes=start- or bytes=-suffix
+    BYTE_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+    # Media image fields that can own a path under original/thumbnails/user/
+    THUMBNAIL_FIELDS = ("thumbnail", "poster", "uploaded_thumbnail", "uploaded_poster", "sprites")
 
     @staticmethod
     def _normalize_to_relative(path: str | None) -> str | None:
@@ -347,13 +561,7 @@ class SecureMediaView(View):
         """
         if not path:
             return path
-        media_root = settings.MEDIA_ROOT
-        # Ensure consistent trailing slash for prefix matching
-        if not media_root.endswith("/"):
-            media_root = media_root + "/"
-        if path.startswith(media_root):
-            return path[len(media_root) :]
-        return path
+        return _normalize_to_relative_cached(settings.MEDIA_ROOT, path)
 
     CONTENT_TYPES = {
         ".mp4": "video/mp4",
@@ -372,35 +580,39 @@ class SecureMediaView(View):
         ".ts": "video/mp2t",
     }
 
-    @method_decorator(cache_control(max_age=CACHE_CONTROL_MAX_AGE, private=True))
     def get(self, request, file_path: str):
         """Handle GET requests for secure media files."""
         return self._handle_request(request, file_path)
 
-    @method_decorator(cache_control(max_age=CACHE_CONTROL_MAX_AGE, private=True))
     def head(self, request, file_path: str):
         """Handle HEAD requests for secure media files."""
         return self._handle_request(request, file_path, head_request=True)
 
     def _handle_request(self, request, file_path: str, head_request: bool = False):
         """Handle both GET and HEAD requests for secure media files."""
-        file_path = unquote(file_path)
-        logger.debug(f"Secure media request for: {file_path}")
+        # Most paths carry no percent-escapes; skip the unquote scan/copy for those
+        if "%" in file_path:
+            file_path = unquote(file_path)
+        logger.debug("Secure media request for: %s", file_path)
 
         # Enhanced path validation
         if not self._is_valid_file_path(file_path):
             logger.warning(f"Invalid file path detected: {file_path}")
             raise Http404("Invalid file path")
 
-        # Check if it's a public file that bypasses media permissions
+        # Public files and non-video files are served before any media lookup.
+        # Public paths hold the same bytes for every visitor, so shared caches
+        # (CDN, reverse proxy) may keep them too; other files stay in the browser cache.
         if self._is_public_media_file(file_path):
-            logger.debug(f"Serving public media file: {file_path}")
-            return self._serve_file(file_path, head_request)
-
-        # Check if it's a non-video file that bypasses authorization
+            logger.debug("Serving public file without authorization check: %s", file_path)
+            response = self._serve_file(request, file_path, head_request)
+            patch_cache_control(response, public=True, max_age=CACHE_CONTROL_MAX_AGE)
+            return response
         if self._is_non_video_file(file_path):
-            logger.debug(f"Serving non-video file without authorization check: {file_path}")
-            return self._serve_file(file_path, head_request)
+            logger.debug("Serving file without authorization check: %s", file_path)
+            response = self._serve_file(request, file_path, head_request)
+            patch_cache_control(response, private=True, max_age=CACHE_CONTROL_MAX_AGE)
+            return response
 
         # Get media object and actual file path (handles ownership transfers)
         media, actual_file_path = self._get_media_from_path_cached(file_path)
@@ -408,7 +620,7 @@ class SecureMediaView(View):
             logger.warning(f"Media not found for path: {file_path}")
             raise Http404("Media not found")
 
-        logger.debug(f"Found media: {media.friendly_token} (state: {media.state})")
+        logger.debug("Found media: %s (state: %s)", media.friendly_token, media.state)
 
         if not self._check_access_permission(request, media):
             logger.warning(f"Access denied for media: {media.friendly_token} (user: {request.user})")
@@ -428,48 +640,90 @@ class SecureMediaView(View):
             valid_token = self._get_valid_restricted_token(request, media)
             return self._serve_rewritten_manifest(request, serving_path, token=valid_token, head_request=head_request)
 
-        response = self._serve_file(serving_path, head_request)
+        response = self._serve_file(request, serving_path, head_request)
 
         # Add Referrer-Policy for restricted media
         if media.state == "restricted":
             response["Referrer-Policy"] = "same-origin"
+            # Access rests on a token that can expire, so the browser must come back
+            # (a cheap conditional request) rather than reuse its copy for a week
+            patch_cache_control(response, private=True, max_age=0)
+        else:
+            patch_cache_control(response, private=True, max_age=CACHE_CONTROL_MAX_AGE)
 
         return response
 
+    def _authorize_paths(self, request, file_paths) -> dict[str, bool]:
+        """
+        Decide access for many file paths at once (e.g. every thumbnail on a gallery page).
+
+        Public and other non-associated files are answered without a lookup. User
+        thumbnail paths are resolved with one grouped query on the Media image fields
+        (relative and legacy absolute names), which also proves ownership since only
+        exact matches are returned. When several media own the same name, the one whose
+        owner is named in the path wins, then the oldest, as in _get_media_from_path.
+        Any other path (videos, HLS, subtitles, preview GIFs) is not resolved here, so a
+        batch never costs more than one query; it is reported as not authorized and has
+        to be requested directly. Each media's permission is checked once however many
+        of its paths were requested.
+
+        Returns:
+            A dict mapping every requested path to whether it may be served
+        """
+        results = {}
+        thumbnail_usernames = {}
+        for file_path in dict.fromkeys(file_paths):
+            match = self.THUMBNAIL_PATH_PATTERN.match(file_path)
+            if not self._is_valid_file_path(file_path):
+                results[file_path] = False
+            elif self._bypasses_authorization(file_path):
+                results[file_path] = True
+            elif match:
+                thumbnail_usernames[file_path] = match.group(1)
+            else:
+                results[file_path] = False
+
+        if not thumbnail_usernames:
+            return results
+
+        stored_names = []
+        for file_path in thumbnail_usernames:
+            stored_names += [file_path, os.path.join(settings.MEDIA_ROOT, file_path)]
+        query = Q()
+        for field_name in self.THUMBNAIL_FIELDS:
+            query |= Q(**{f"{field_name}__in": stored_names})
+
+        # Normalized stored name → media owning it, oldest first
+        owners = {}
+        candidates = Media.objects.only(*SECURE_MEDIA_FIELDS).annotate(owner_username=F("user__username")).filter(query)
+        for media in candidates.order_by("id"):
+            for field_name in self.THUMBNAIL_FIELDS:
+                field_file = getattr(media, field_name)
+                if field_file:
+                    owners.setdefault(self._normalize_to_relative(field_file.name), []).append(media)
+
+        decisions = {}
+        for file_path, username in thumbnail_usernames.items():
+            owning_media = owners.get(file_path)
+            if not owning_media:
+                results[file_path] = False
+                continue
+            media = next((m for m in owning_media if m.owner_username == username), owning_media[0])
+            if media.id not in decisions:
+                decisions[media.id] = self._check_access_permission(request, media)
+            results[file_path] = decisions[media.id]
+
+        return results
+
     def _is_valid_file_path(self, file_path: str) -> bool:
         """Enhanced path validation with security checks."""
-        # Check for path traversal and invalid characters
-        if self.INVALID_PATH_PATTERNS.search(file_path):
-            return False
-
-        # Check if path starts with /
-        if file_path.startswith("/"):
+        # Cheapest checks first: over-long paths and paths outside the allowed prefixes
+        # (which also rules out absolute paths) never reach the character scans
+        if len(file_path) > MAX_MEDIA_PATH_LENGTH or not file_path.startswith(ALLOWED_MEDIA_PATHS):
             return False
 
-        # Combine allowed video/media prefixes with public media paths for validation
-        allowed_prefixes = [
-            # Video-specific paths (with videos/ prefix)
-            "videos/media/",
-            "videos/encoded/",
-            "videos/subtitles/",
-            "other_media/",
-            # Standalone media paths (critical for video processing)
-            "hls/",  # HLS streaming files (REQUIRED for playback)
-            "encoded/",  # Encoded video files (REQUIRED for transcoding)
-            "original/",  # Original media files (REQUIRED for various operations)
-        ]
-
-        # Add public paths and their "original/" variants to the list of allowed paths
-        # to ensure they are not incorrectly blocked.
-        for public_path in PUBLIC_MEDIA_PATHS:
-            allowed_prefixes.append(public_path)
-            # Some public assets like thumbnails can also be in an 'original' directory
-            original_path = f"original/{public_path}"
-            if original_path not in allowed_prefixes:
-                allowed_prefixes.append(original_path)
-
-        # Check if the file path starts with any of the allowed prefixes
-        return bool(any(file_path.startswith(prefix) for prefix in allowed_prefixes))
+        # Check for path traversal and invalid characters
+        return ".." not in file_path and not self._find_invalid_path_chars(file_path)
 
     def _verify_media_owns_thumbnail_path(self, media: Media, file_path: str) -> bool:
         """
@@ -486,48 +740,57 @@ class SecureMediaView(View):
         Returns:
             True if the media owns this exact path, False otherwise
         """
-        # Get all thumbnail-related paths from the media object, normalized to relative paths
-        thumbnail_paths = []
-
-        if media.thumbnail:
-            thumbnail_paths.append(media.thumbnail.name if hasattr(media.thumbnail, "name") else str(media.thumbnail))
-        if media.poster:
-            thumbnail_paths.append(media.poster.name if hasattr(media.poster, "name") else str(media.poster))
-        if media.uploaded_thumbnail:
-            thumbnail_paths.append(
-                media.uploaded_thumbnail.name
-                if hasattr(media.uploaded_thumbnail, "name")
-                else str(media.uploaded_thumbnail)
-            )
-        if media.uploaded_poster:
-            thumbnail_paths.append(
-                media.uploaded_poster.name if hasattr(media.uploaded_poster, "name") else str(media.uploaded_poster)
-            )
-        if media.sprites:
-            thumbnail_paths.append(media.sprites.name if hasattr(media.sprites, "name") else str(media.sprites))
-
-        # Normalize all paths to relative for comparison (handles absolute paths in DB)
+        # Normalize to relative for comparison (handles absolute paths in DB); the
+        # requested path is normalized once and fields stop at the first exact match
         normalized_file_path = self._normalize_to_relative(file_path)
-        normalized_thumbnail_paths = [self._normalize_to_relative(p) for p in thumbnail_paths]
-
-        # Check if the requested path matches any of the media's thumbnail paths
-        if normalized_file_path in normalized_thumbnail_paths:
-            return True
+        for field_name in self.THUMBNAIL_FIELDS:
+            field_file = getattr(media, field_name)
+            if not field_file:
+                continue
+            stored_path = field_file.name if hasattr(field_file, "name") else str(field_file)
+            if self._normalize_to_relative(stored_path) == normalized_file_path:
+                return True
 
         # Also check for encoded GIF paths
-        if file_path.startswith("encoded/") and file_path.lower().endswith(".gif"):
+        if self._is_encoded_gif(file_path):
             # For encoded GIFs, verify via the Encoding model
             # The path format is: encoded/{profile_id}/{username}/{filename}
-            from .models import Encoding
+            # _fetch_media_light preloads the answer as an annotation on cache hits
+            owns_encoded_gif = vars(media).get("owns_encoded_gif")
+            if owns_encoded_gif is not None:
+                return owns_encoded_gif
 
-            # Check if any encoding for this media has this exact path
-            # Use media_file (the actual DB field) instead of media_encoding_url (computed property)
-            # Query both relative and absolute variants for legacy DB compatibility
-            absolute_file_path = os.path.join(settings.MEDIA_ROOT, file_path)
-            return Encoding.objects.filter(media=media, media_file__in=[file_path, absolute_file_path]).exists()
+            return self._encoding_owns_path(file_path, media=media).exists()
 
         return False
 
+    @staticmethod
+    def _encoding_owns_path(file_path: str, **filters):
+        """Encodings whose media_file is exactly file_path.
+
+        Use media_file (the actual DB field) instead of media_encoding_url (computed property).
+        Query both relative and absolute variants for legacy DB compatibility.
+        """
+        absolute_file_path = os.path.join(settings.MEDIA_ROOT, file_path)
+        return Encoding.objects.filter(media_file__in=[file_path, absolute_file_path], **filters)
+
+    def _fetch_media_light(self, media_id: int, encoded_gif_path: str | None = None) -> Media:
+        """Fetch a Media by ID for serving, without joining the owner row.
+
+        Only SECURE_MEDIA_FIELDS are loaded; permission checks compare the owner
+        via ``user_id``. Branches that need the owner's username (ownership
+        transfers) query with ``select_related("user")`` instead.
+
+        When ``encoded_gif_path`` is given, the Encoding ownership check is folded
+        into the same query as an ``owns_encoded_gif`` annotation.
+        """
+        queryset = Media.objects.only(*SECURE_MEDIA_FIELDS)
+        if encoded_gif_path:
+            queryset = queryset.annotate(
+                owns_encoded_gif=Exists(self._encoding_owns_path(encoded_gif_path, media=OuterRef("pk")))
+            )
+        return queryset.get(id=media_id)
+
     def _get_media_from_path_cached(self, file_path: str) -> tuple[Media | None, str | None]:
         """
         Get media from file path with caching.
@@ -535,35 +798,44 @@ class SecureMediaView(View):
 
         Returns:
             Tuple of (Media object, actual_file_path)
-            - On cache hit: (Media, None) - use original file_path
+            - On cache hit: (Media, cached actual path override or None)
             - On cache miss: delegates to _get_media_from_path which may return actual path override
         """
+        # HLS files resolve by their hls/{uid}/ folder alone, so every manifest and
+        # segment of a media shares one cache entry: after the master playlist,
+        # segment requests hit the cache instead of each doing its own lookup.
+        hls_match = self.HLS_PATH_PATTERN.match(file_path)
+        cache_path = hls_match.group(0) if hls_match else file_path
+
         # Try cache first
-        cached_media_id = get_cached_media_id(file_path)
+        cached_media_id, cached_actual_file_path, cached_public_media = get_cached_media_entry(cache_path)
+        if cached_public_media is not None:
+            # Public/unlisted HLS media need nothing beyond the snapshot, so segment
+            # requests skip the database entirely
+            return (cached_public_media, cached_actual_file_path)
         if cached_media_id:
             try:
-                media = Media.objects.select_related("user").get(id=cached_media_id)
+                is_encoded_gif = self._is_encoded_gif(file_path)
+                media = self._fetch_media_light(cached_media_id, encoded_gif_path=file_path if is_encoded_gif else None)
 
                 # SECURITY: Verify the cached media still owns this exact path
                 # This prevents stale cache entries from authorizing access after
                 # ownership transfers or permission changes (P1-002 fix)
-                if file_path.startswith("original/thumbnails/user/") or (
-                    file_path.startswith("encoded/") and file_path.lower().endswith(".gif")
-                ):
+                if file_path.startswith("original/thumbnails/user/") or is_encoded_gif:
                     if not self._verify_media_owns_thumbnail_path(media, file_path):
                         logger.warning(f"Stale cache: media {media.friendly_token} no longer owns path {file_path}")
                         # Invalidate stale media path cache entry (file_path → media_id mapping)
                         cache.delete(get_media_path_cache_key(file_path))
                         # Fall through to fresh lookup
                     else:
-                        return (media, None)
+                        return (media, cached_actual_file_path)
                 else:
                     # For non-thumbnail paths, use existing behavior
-                    return (media, None)
+                    return (media, cached_actual_file_path)
 
             except Media.DoesNotExist:
                 # Stale cache - media was deleted
-                logger.debug(f"Stale cache entry for path {file_path}, media {cached_media_id} not found")
+                logger.debug("Stale cache entry for path %s, media %s not found", file_path, cached_media_id)
                 # Don't need to explicitly delete - will expire naturally
                 pass
 
@@ -572,11 +844,14 @@ class SecureMediaView(View):
 
         # Cache the result if found
         if media:
-            set_cached_media_id(file_path, media.id)
             # Normalize actual_file_path in case the DB stores absolute paths,
             # since _serve_file expects relative paths for X-Accel-Redirect
             if actual_file_path:
                 actual_file_path = self._normalize_to_relative(actual_file_path)
+            # Only public/unlisted HLS media are snapshotted; private and restricted
+            # media are always re-read so state changes apply immediately
+            public_media = media if hls_match and media.state in ("public", "unlisted") else None
+            set_cached_media_id(cache_path, media.id, actual_file_path, public_media)
 
         return (media, actual_file_path)
 
@@ -595,25 +870,33 @@ class SecureMediaView(View):
         if file_path.startswith("original/user/"):
             # Extract filename and username from path
             try:
-                parts = file_path.split("/")
-                if len(parts) >= 4:
-                    username = parts[2]
-                    filename = parts[3]
-                    logger.debug(f"Searching for media: username={username}, filename={filename}")
+                match = self.ORIGINAL_PATH_PATTERN.match(file_path)
+                if match:
+                    username, filename = match.groups()
+                    logger.debug("Searching for media: username=%s, filename=%s", username, filename)
 
-                    # Query by filename field (much faster with index)
+                    # Query by filename field (much faster with index). The owner join is only
+                    # needed for the filter, so just the serving fields are loaded.
                     media = (
-                        Media.objects.select_related("user").filter(user__username=username, filename=filename).first()
+                        Media.objects.only(*SECURE_MEDIA_FIELDS)
+                        .filter(user__username=username, filename=filename)
+                        .first()
                     )
 
                     if media:
-                        logger.debug(f"Found media by filename: {media.friendly_token}")
+                        logger.debug("Found media by filename: %s", media.friendly_token)
                         return (media, None)
 
                     # Fallback: if not found, try querying by media_file path
-                    # This handles edge cases where filename field wasn't populated
+                    # This handles edge cases where filename field wasn't populated.
+                    # The stored name is the requested path itself, so an exact (indexed)
+                    # match is tried before the per-user suffix scan kept for legacy rows.
                     logger.debug("Filename lookup failed, attempting fallback by media_file path")
                     media = (
+                        Media.objects.select_related("user")
+                        .filter(user__username=username, media_file=file_path)
+                        .first()
+                    ) or (
                         Media.objects.select_related("user")
                         .filter(user__username=username, media_file__endswith=filename)
                         .first()
@@ -656,11 +939,10 @@ class SecureMediaView(View):
         # These include: thumbnail, poster, uploaded_thumbnail, uploaded_poster, sprites
         elif file_path.startswith("original/thumbnails/user/"):
             try:
-                parts = file_path.split("/")
-                if len(parts) >= 5:
-                    username = parts[3]
-                    filename = parts[4]
-                    logger.debug(f"Searching for media thumbnail: username={username}, filename={filename}")
+                match = self.THUMBNAIL_PATH_PATTERN.match(file_path)
+                if match:
+                    username, filename = match.groups()
+                    logger.debug("Searching for media thumbnail: username=%s, filename=%s", username, filename)
 
                     # Search across all thumbnail-related fields
                     # The filename could be in thumbnail, poster, uploaded_thumbnail,
@@ -669,8 +951,9 @@ class SecureMediaView(View):
                     # store either format (legacy data uses absolute paths).
                     thumbnail_path = f"original/thumbnails/user/{username}/{filename}"
                     absolute_thumbnail_path = os.path.join(settings.MEDIA_ROOT, thumbnail_path)
+                    # The owner join is only needed for the filter, so just the serving fields are loaded
                     media = (
-                        Media.objects.select_related("user")
+                        Media.objects.only(*SECURE_MEDIA_FIELDS)
                         .filter(
                             Q(user__username=username)
                             & (
@@ -686,7 +969,7 @@ class SecureMediaView(View):
                     )
 
                     if media:
-                        logger.debug(f"Found media by thumbnail path: {media.friendly_token}")
+                        logger.debug("Found media by thumbnail path: %s", media.friendly_token)
                         return (media, None)
 
                     # Fallback: search by filename ending (P2-005 optimization)
@@ -718,31 +1001,38 @@ class SecureMediaView(View):
 
                     # SECURITY: Find a media that actually owns this exact path (P1-001 fix)
                     # Prioritize matches with correct username, then fall back to any verified match
-                    # This handles both normal lookups and ownership transfers in one pass
-                    verified_match = None
-                    ownership_transfer_match = None
-
-                    for media in matches[:10]:  # Limit to prevent DoS
-                        if self._verify_media_owns_thumbnail_path(media, file_path):
-                            if media.user.username == username:
-                                # Best match: correct username and verified path
-                                verified_match = media
-                                break
-                            elif ownership_transfer_match is None:
-                                # Ownership transfer: different username but verified path
-                                ownership_transfer_match = media
+                    # This handles both normal lookups and ownership transfers in one pass.
+                    # Verification is done DB-side: among the first candidates (limited to
+                    # prevent DoS), pick the one whose thumbnail field equals the exact path,
+                    # ordering username matches first.
+                    candidate_ids = matches.values("id")[:10]
+                    owned_paths = [thumbnail_path, absolute_thumbnail_path]
+                    verified_match = (
+                        Media.objects.select_related("user")
+                        .filter(
+                            Q(id__in=candidate_ids)
+                            & (
+                                Q(thumbnail__in=owned_paths)
+                                | Q(poster__in=owned_paths)
+                                | Q(uploaded_thumbnail__in=owned_paths)
+                                | Q(uploaded_poster__in=owned_paths)
+                                | Q(sprites__in=owned_paths)
+                            )
+                        )
+                        .order_by(Case(When(user__username=username, then=0), default=1), "id")
+                        .first()
+                    )
 
                     if verified_match:
-                        logger.debug(f"Found media by thumbnail filename: {verified_match.friendly_token}")
+                        if verified_match.user.username == username:
+                            logger.debug("Found media by thumbnail filename: %s", verified_match.friendly_token)
+                        else:
+                            logger.info(
+                                f"Found media thumbnail via ownership transfer: "
+                                f"{verified_match.friendly_token} (verified owner of path)"
+                            )
                         return (verified_match, None)
 
-                    if ownership_transfer_match:
-                        logger.info(
-                            f"Found media thumbnail via ownership transfer: "
-                            f"{ownership_transfer_match.friendly_token} (verified owner of path)"
-                        )
-                        return (ownership_transfer_match, None)
-
                     # If no verified match found, log and fail closed
                     if match_count > 0:
                         logger.warning(
@@ -757,11 +1047,10 @@ class SecureMediaView(View):
         # Subtitles contain transcripts of video content and must be protected (P2-004 fix)
         elif file_path.startswith("original/subtitles/user/"):
             try:
-                parts = file_path.split("/")
-                if len(parts) >= 5:
-                    username = parts[3]
-                    filename = parts[4]
-                    logger.debug(f"Searching for subtitle: username={username}, filename={filename}")
+                match = self.SUBTITLE_PATH_PATTERN.match(file_path)
+                if match:
+                    username, filename = match.groups()
+                    logger.debug("Searching for subtitle: username=%s, filename=%s", username, filename)
 
                     # Look up the parent media via the Subtitle model.
                     # Query both relative and absolute path variants since the DB may
@@ -774,7 +1063,7 @@ class SecureMediaView(View):
                     )
 
                     if subtitle:
-                        logger.debug(f"Found subtitle's parent media: {subtitle.media.friendly_token}")
+                        logger.debug("Found subtitle's parent media: %s", subtitle.media.friendly_token)
                         return (subtitle.media, None)
 
                     # Fallback: search by filename ending (handles path variations)
@@ -791,7 +1080,7 @@ class SecureMediaView(View):
                             subtitle.subtitle_file.name if subtitle.subtitle_file else ""
                         )
                         if subtitle.subtitle_file and normalized_db_path == normalized_file_path:
-                            logger.debug(f"Found subtitle by filename: {subtitle.media.friendly_token}")
+                            logger.debug("Found subtitle by filename: %s", subtitle.media.friendly_token)
                             return (subtitle.media, None)
                         else:
                             logger.warning(
@@ -833,104 +1122,92 @@ class SecureMediaView(View):
 
         # Handle encoded files: encoded/{profile_id}/{username}/{filename}
         elif file_path.startswith("encoded/"):
-            parts = file_path.split("/")
-            if len(parts) >= 4:
-                profile_id_str = parts[1]
-                username = parts[2]
-                filename = parts[3]
+            match = self.ENCODED_PATH_PATTERN.match(file_path)
+            if match:
+                profile_id_str, username, filename = match.groups()
 
-                logger.debug(f"Encoded file: profile_id={profile_id_str}, username={username}, filename={filename}")
+                logger.debug(
+                    "Encoded file: profile_id=%s, username=%s, filename=%s", profile_id_str, username, filename
+                )
 
                 try:
-                    # Query by filename field (much faster with index)
-                    filter_kwargs = {
-                        "media__user__username": username,
-                        "filename": filename,
-                    }
+                    # Resolve the best match in one query, ranked by lookup strategy:
+                    # 0. username + filename (indexed filename field)
+                    # 1. username + media_file suffix (edge cases where filename wasn't populated),
+                    #    matched as an indexed prefix of the reversed path
+                    # 2. filename only (ownership transfers: username in URL isn't the current owner)
+                    username_matches = Q(media__user__username=username)
+                    encodings = Encoding.objects.select_related("media", "media__user").filter(
+                        (username_matches & (Q(filename=filename) | Q(media_file_reversed__startswith=filename[::-1])))
+                        | Q(filename=filename)
+                    )
 
                     if profile_id_str.isdigit():
-                        filter_kwargs["profile_id"] = int(profile_id_str)
+                        encodings = encodings.filter(profile_id=int(profile_id_str))
 
-                    encoding = Encoding.objects.select_related("media", "media__user").filter(**filter_kwargs).first()
+                    encoding = (
+                        encodings.annotate(
+                            match_priority=Case(
+                                When(username_matches & Q(filename=filename), then=0),
+                                When(username_matches, then=1),
+                                default=2,
+                                output_field=IntegerField(),
+                            )
+                        )
+                        .order_by("match_priority", "id")
+                        .first()
+                    )
+
+                    if encoding is None:
+                        return (None, None)
 
-                    if encoding:
+                    if encoding.match_priority == 0:
                         # Username matches - no path override needed
                         return (encoding.media, None)
 
-                    # Fallback: if not found, try querying by media_file path
-                    # This handles edge cases where filename field wasn't populated
-                    logger.debug("Encoding filename lookup failed, attempting fallback by media_file path")
-                    fallback_kwargs = {
-                        "media__user__username": username,
-                        "media_file__endswith": filename,
-                    }
-
-                    if profile_id_str.isdigit():
-                        fallback_kwargs["profile_id"] = int(profile_id_str)
-
-                    encoding = Encoding.objects.select_related("media", "media__user").filter(**fallback_kwargs).first()
-
-                    if encoding:
+                    if encoding.match_priority == 1:
                         logger.info(
                             f"Found encoding by fallback path lookup for media: {encoding.media.friendly_token}"
                         )
-                        # Backfill the filename field for future queries
+                        # Backfill the filename field for future queries, without a write on the request path
                         if not encoding.filename:
-                            encoding.filename = filename
-                            encoding.save(update_fields=["filename"])
-                            logger.info(f"Backfilled filename for encoding {encoding.id}")
+                            try:
+                                backfill_encoding_filename.delay(encoding.id, filename)
+                                logger.info(f"Scheduled filename backfill for encoding {encoding.id}")
+                            except Exception as e:
+                                logger.warning(f"Failed to schedule filename backfill for encoding {encoding.id}: {e}")
                         # Username matches - no path override needed
                         return (encoding.media, None)
 
-                    # Second fallback: handle ownership transfers
-                    # If username in URL doesn't match current owner (e.g., video was transferred),
-                    # look up by filename and profile only
-                    logger.debug(
-                        "Username lookup failed, attempting lookup ignoring username (handles ownership transfers)"
+                    logger.info(
+                        f"Found encoding via ownership transfer fallback (original owner in path: '{username}', current owner: '{encoding.media.user.username}')"
                     )
-                    ownership_transfer_kwargs = {
-                        "filename": filename,
-                    }
-
-                    if profile_id_str.isdigit():
-                        ownership_transfer_kwargs["profile_id"] = int(profile_id_str)
-
-                    encoding = (
-                        Encoding.objects.select_related("media", "media__user")
-                        .filter(**ownership_transfer_kwargs)
-                        .first()
-                    )
-
-                    if encoding:
-                        logger.info(
-                            f"Found encoding via ownership transfer fallback (original owner in path: '{username}', current owner: '{encoding.media.user.username}')"
-                        )
-                        logger.info(f"Media: {encoding.media.friendly_token}")
-                        # Return actual file path from database to avoid username mismatch
-                        actual_path = encoding.media_file.name if encoding.media_file else None
-                        if not actual_path:
-                            logger.error(f"Encoding {encoding.id} has no media_file set!")
-                            return (None, None)
-                        logger.info(f"Using actual file path from database: {actual_path}")
-                        return (encoding.media, actual_path)
-
-                    return (None, None)
+                    logger.info(f"Media: {encoding.media.friendly_token}")
+                    # Return actual file path from database to avoid username mismatch
+                    actual_path = encoding.media_file.name if encoding.media_file else None
+                    if not actual_path:
+                        logger.error(f"Encoding {encoding.id} has no media_file set!")
+                        return (None, None)
+                    logger.info(f"Using actual file path from database: {actual_path}")
+                    return (encoding.media, actual_path)
 
                 except Exception as e:
                     logger.warning(f"Error finding encoded media: {e}")
 
         # Handle HLS files: hls/{uid_or_folder}/{filename}
         elif file_path.startswith("hls/"):
-            parts = file_path.split("/")
-            if len(parts) >= 3:
-                folder_name = parts[1]
-                logger.debug(f"HLS file in folder: {folder_name}")
+            match = self.HLS_PATH_PATTERN.match(file_path)
+            if match:
+                folder_name = match.group(1)
+                logger.debug("HLS file in folder: %s", folder_name)
 
                 try:
                     # For HLS files, we might need to check if the folder name matches a UID
                     # or try to find media that has HLS files in this directory
                     if self._is_valid_uid(folder_name):
-                        media = Media.objects.select_related("user").filter(uid=folder_name).first()
+                        # Serving fields only: HLS paths never need the owner's username,
+                        # and these columns may be cached as the folder's public snapshot
+                        media = Media.objects.only(*SECURE_MEDIA_FIELDS).filter(uid=folder_name).first()
                         return (media, None)
                     else:
                         # Fallback: try to find any media that might have HLS files
@@ -944,13 +1221,14 @@ class SecureMediaView(View):
 
     def _is_valid_uid(self, uid_str: str) -> bool:
         """Check if a string looks like a valid UID (8-64 hex characters)."""
-        if not uid_str or len(uid_str) < 8 or len(uid_str) > 64:
-            return False
-        try:
-            int(uid_str, 16)  # Try to parse as hex
-            return True
-        except ValueError:
-            return False
+        return bool(uid_str) and self._match_uid(uid_str) is not None
+
+    def _bypasses_authorization(self, file_path: str) -> bool:
+        """
+        Check if the file can be served without resolving its media or checking permissions:
+        either a public file, or a non-video file that isn't media-associated.
+        """
+        return self._is_public_media_file(file_path) or self._is_non_video_file(file_path)
 
     def _is_public_media_file(self, file_path: str) -> bool:
         """
@@ -960,13 +1238,9 @@ class SecureMediaView(View):
         Note: Media-associated files (thumbnails, preview GIFs) are NOT public
         and require authorization checks for private/restricted media.
         """
-        # Check if the file is in any of the public media directories
-        for public_path in PUBLIC_MEDIA_PATHS:
-            if file_path.startswith(public_path):
-                return True
-
-        # User logos with original/ prefix are public
-        return bool(file_path.startswith("original/userlogos/"))
+        # Check if the file is in any of the public media directories,
+        # or is a user logo with the original/ prefix
+        return file_path.startswith(PUBLIC_FILE_PREFIXES)
 
     def _is_media_associated_file(self, file_path: str) -> bool:
         """
@@ -976,17 +1250,14 @@ class SecureMediaView(View):
         These files should NOT bypass authorization because they belong to media items
         that may be private or restricted.
         """
-        # Media thumbnails: original/thumbnails/user/{username}/{filename}
-        if file_path.startswith("original/thumbnails/user/"):
-            return True
+        # Media thumbnails and subtitles (see MEDIA_ASSOCIATED_PATHS), or
+        # preview GIFs in encoded directory: encoded/{profile_id}/{username}/{filename}.gif
+        return file_path.startswith(MEDIA_ASSOCIATED_PATHS) or self._is_encoded_gif(file_path)
 
-        # Preview GIFs in encoded directory: encoded/{profile_id}/{username}/{filename}.gif
-        if file_path.startswith("encoded/") and file_path.lower().endswith(".gif"):
-            return True
-
-        # Subtitle files: original/subtitles/user/{username}/{filename}
-        # Subtitles contain transcripts of video content and must be protected
-        return bool(file_path.startswith("original/subtitles/user/"))
+    @staticmethod
+    def _is_encoded_gif(file_path: str) -> bool:
+        """Check for a preview GIF under encoded/, lowercasing only the suffix rather than the whole path."""
+        return file_path.startswith("encoded/") and file_path[-4:].lower() == ".gif"
 
     def _is_non_video_file(self, file_path: str) -> bool:
         """
@@ -997,65 +1268,42 @@ class SecureMediaView(View):
         authorization checks because they contain or reveal media content.
         """
         # Media-associated files (thumbnails, preview GIFs, subtitles) require authorization
-        # even though they're not video files
-        if self._is_media_associated_file(file_path):
+        # even though they're not video files, and anything in the HLS directory is streaming content
+        if file_path.startswith(NEVER_BYPASSED_PREFIXES) or self._is_encoded_gif(file_path):
             return False
 
-        file_ext = os.path.splitext(file_path)[1].lower()
-
-        # Common video file extensions
-        video_extensions = {
-            ".mp4",
-            ".avi",
-            ".mkv",
-            ".mov",
-            ".wmv",
-            ".flv",
-            ".webm",
-            ".m4v",
-            ".3gp",
-            ".ogv",
-            ".asf",
-            ".rm",
-            ".rmvb",
-            ".vob",
-            ".mpg",
-            ".mpeg",
-            ".mp2",
-            ".mpe",
-            ".mpv",
-            ".m2v",
-            ".m4p",
-            ".f4v",
-            ".ts",
-            ".m3u8",  # Include HLS formats
-        }
+        file_ext = get_file_extension(file_path)
 
+        # Compression suffixes (.gz, .tgz, ...) make the type depend on the rest of the
+        # name, so only those still go through mimetypes with the full path
+        if file_ext in mimetypes.encodings_map or file_ext in mimetypes.suffix_map:
+            return not self._is_video_content_type(mimetypes.guess_type(file_path)[0])
+
+        return not self._is_video_extension(file_ext)
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _is_video_extension(cls, file_ext: str) -> bool:
+        """Classify an extension as video-like once, instead of per request."""
         # Check if it's a video file by extension
-        if file_ext in video_extensions:
-            return False  # It's a video file, so don't bypass authorization
+        if file_ext in VIDEO_EXTENSIONS:
+            return True
 
         # Also check by content type for additional detection
-        content_type = self.CONTENT_TYPES.get(file_ext)
+        content_type = cls.CONTENT_TYPES.get(file_ext)
         if not content_type:
-            content_type, _ = mimetypes.guess_type(file_path)
+            content_type, _ = mimetypes.guess_type(f"file{file_ext}")
+        return cls._is_video_content_type(content_type)
 
-        # Consider it a video file if content type starts with 'video/' or is HLS
-        is_video_by_content_type = (
-            (content_type and content_type.startswith("video/"))
+    @staticmethod
+    def _is_video_content_type(content_type: str | None) -> bool:
+        """Consider it a video file if content type starts with 'video/' or is HLS."""
+        return bool(content_type) and (
+            content_type.startswith("video/")
             or content_type == "application/vnd.apple.mpegurl"  # .m3u8 files
             or content_type == "video/mp2t"  # .ts files
         )
 
-        # Also check if it's in HLS directory (streaming content)
-        is_in_hls_directory = file_path.startswith("hls/")
-
-        # It's a video file if any of the checks match
-        is_video_like = is_video_by_content_type or is_in_hls_directory
-
-        # Return True if it's NOT a video file (so it can bypass authorization)
-        return not is_video_like
-
     def _user_has_elevated_access(self, user, media: Media) -> bool:
         """Delegate to module-level function."""
         return user_has_elevated_access(user, media)
@@ -1128,19 +1376,26 @@ class SecureMediaView(View):
         response["Referrer-Policy"] = "same-origin"
         return response
 
-    def _serve_file(self, file_path: str, head_request: bool = False) -> HttpResponse:
+    def _serve_file(self, request, file_path: str, head_request: bool = False) -> HttpResponse:
         """Serve file using X-Accel-Redirect (production) or Django (development)."""
         if getattr(settings, "USE_X_ACCEL_REDIRECT", True):
             return self._serve_file_via_xaccel(file_path, head_request)
-        return self._serve_file_direct_django(file_path, head_request)
+        return self._serve_file_direct_django(request, file_path, head_request)
 
     def _get_content_type_and_headers(self, file_path: str) -> tuple:
-        """Get content type and appropriate security headers for the file."""
-        file_ext = os.path.splitext(file_path)[1].lower()
-        content_type = self.CONTENT_TYPES.get(file_ext)
-        is_video_like = (
-            content_type and content_type.startswith("video/")
-        ) or content_type == "application/vnd.apple.mpegurl"
+        """Get content type, appropriate security headers and whether the file is a video/* type."""
+        return self._content_type_and_headers_for_ext(get_file_extension(file_path))
+
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _content_type_and_headers_for_ext(cls, file_ext: str) -> tuple:
+        """Resolve content type and security headers once per extension.
+
+        The returned headers dict is shared; callers must not mutate it.
+        """
+        content_type = cls.CONTENT_TYPES.get(file_ext)
+        is_video = bool(content_type and content_type.startswith("video/"))
+        is_video_like = is_video or content_type == "application/vnd.apple.mpegurl"
         # Choose appropriate security headers based on content type
         if is_video_like:
             headers = VIDEO_SECURITY_HEADERS
@@ -1149,44 +1404,31 @@ class SecureMediaView(View):
         else:
             headers = SECURITY_HEADERS
 
-        return content_type, headers
+        return content_type, headers, is_video
 
     def _serve_file_via_xaccel(self, file_path: str, head_request: bool = False) -> HttpResponse:
         """Serve file using Nginx's X-Accel-Redirect header."""
-        if file_path.startswith("original/"):
-            unencoded = f"/internal/media/original/{file_path[len('original/') :]}"
-        else:
-            unencoded = f"/internal/media/{file_path}"
-        # Ensure header value is a valid URI (encode spaces/non-ASCII, keep slashes)
-        internal_path = quote(unencoded, safe="/:")
+        internal_path = get_internal_media_uri(file_path)
+
+        content_type, security_headers, is_video = self._get_content_type_and_headers(file_path)
 
-        response = HttpResponse()
+        # Security headers are applied in one pass at construction time
+        response = HttpResponse(content_type=content_type or "application/octet-stream", headers=security_headers)
 
         # For HEAD requests, we still set the X-Accel-Redirect header
         # but Nginx will not include the body in the response
         response["X-Accel-Redirect"] = internal_path
 
-        content_type, security_headers = self._get_content_type_and_headers(file_path)
-
-        if content_type:
-            response["Content-Type"] = content_type
-        else:
-            response["Content-Type"] = "application/octet-stream"
-
-        if content_type and content_type.startswith("video/"):
+        if is_video:
             response["X-Accel-Buffering"] = "no"
         else:
             response["X-Accel-Buffering"] = "yes"
 
-        # Add security headers
-        for header, value in security_headers.items():
-            response[header] = value
-
         response["Content-Disposition"] = "inline"
 
         return response
 
-    def _serve_file_direct_django(self, file_path: str, head_request: bool = False) -> HttpResponse:
+    def _serve_file_direct_django(self, request, file_path: str, head_request: bool = False) -> HttpResponse:
         """Serve file directly through Django (for development)."""
         # Normalize the path to resolve any '..' or '.' components (no filesystem access).
         # _is_valid_file_path already blocks '..' patterns, but normpath provides defense-in-depth.
@@ -1200,45 +1442,134 @@ class SecureMediaView(View):
             logger.warning(f"Path traversal attempt blocked: {file_path}")
             raise Http404("Invalid file path")
 
-        logger.debug(f"Attempting to serve file directly: {safe_path}")
+        logger.debug("Attempting to serve file directly: %s", safe_path)
 
-        if not os.path.isfile(safe_path):
+        # One stat call answers both "is it a regular file" and "how big is it"
+        try:
+            file_stat = os.stat(safe_path)
+        except OSError:
+            file_stat = None
+        if file_stat is None or not stat.S_ISREG(file_stat.st_mode):
             logger.warning(f"File not found at: {safe_path}")
             raise Http404("File not found")
 
-        content_type, security_headers = self._get_content_type_and_headers(file_path)
+        content_type, security_headers, _ = self._get_content_type_and_headers(file_path)
+
+        # Validators come from the stat above, so repeat requests can be answered
+        # with a bodyless 304 without opening the file
+        etag = f'W/"{file_stat.st_size:x}-{file_stat.st_mtime_ns:x}"'
+        last_modified = int(file_stat.st_mtime)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            # Same security headers and validator as a full response
+            for header, value in security_headers.items():
+                not_modified[header] = value
+            not_modified["ETag"] = etag
+            return not_modified
         if not content_type:
             content_type, _ = mimetypes.guess_type(safe_path)
             content_type = content_type or "application/octet-stream"
 
-        logger.debug(f"Serving file with content-type: {content_type}")
+        logger.debug("Serving file with content-type: %s", content_type)
 
         try:
             if head_request:
                 # For HEAD requests, return response with headers but no body
-                response = HttpResponse(content_type=content_type)
-                # Set Content-Length header for HEAD requests
-                try:
-                    file_size = os.path.getsize(safe_path)
-                    response["Content-Length"] = str(file_size)
-                except OSError:
-                    # If we can't get file size, don't set Content-Length
-                    pass
+                response = HttpResponse(content_type=content_type, headers=security_headers)
+                response["Content-Length"] = str(file_stat.st_size)
             else:
-                # For GET requests, return the file content
-                response = FileResponse(open(safe_path, "rb"), content_type=content_type)
+                # For GET requests, return the file content. FileResponse hands the
+                # file to wsgi.file_wrapper (sendfile) when the server provides one;
+                # unbuffered, since sendfile and the range reader bypass a Python buffer anyway.
+                file = open(safe_path, "rb", buffering=0)
+                range_header = request.headers.get("Range")
+                if range_header:
+                    response = self._ranged_file_response(
+                        file, file_stat.st_size, range_header, content_type, security_headers
+                    )
+                else:
+                    response = FileResponse(file, content_type=content_type, headers=security_headers)
 
+            response["Accept-Ranges"] = "bytes"
             response["Content-Disposition"] = "inline"
-
-            # Add security headers
-            for header, value in security_headers.items():
-                response[header] = value
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(last_modified)
 
             return response
         except OSError as e:
             logger.error(f"Error reading file {safe_path}: {e}")
             raise Http404("File could not be read") from e
 
+    def _ranged_file_response(
+        self, file, file_size: int, range_header: str, content_type: str, security_headers: dict
+    ) -> HttpResponse:
+        """Answer a single byte-range request with 206, or 416 if it can't be satisfied.
+
+        Malformed and multi-range headers are ignored and the whole file is served,
+        as RFC 9110 allows, so players seeking in large files only read what they asked for.
+        """
+        try:
+            byte_range = self._parse_byte_range(range_header, file_size)
+        except ValueError:
+            file.close()
+            response = HttpResponse(status=416, headers=security_headers)
+            response["Content-Range"] = f"bytes */{file_size}"
+            return response
+
+        if byte_range is None:
+            return FileResponse(file, content_type=content_type, headers=security_headers)
+
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            self._iter_file_range(file, start, length),
+            status=206,
+            content_type=content_type,
+            headers=security_headers,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        response["Content-Length"] = str(length)
+        return response
+
+    @classmethod
+    def _parse_byte_range(cls, range_header: str, file_size: int) -> tuple[int, int] | None:
+        """Parse a single ``bytes=`` range into inclusive (start, end) offsets.
+
+        Returns None when the header should be ignored; raises ValueError when unsatisfiable.
+        """
+        match = cls.BYTE_RANGE_PATTERN.fullmatch(range_header.strip())
+        if not match or match.group(1) == match.group(2) == "":
+            return None
+        first, last = match.groups()
+
+        if not first:
+            # Suffix range: the last N bytes
+            suffix_length = int(last)
+            if suffix_length == 0 or file_size == 0:
+                raise ValueError("Unsatisfiable suffix range")
+            return (max(file_size - suffix_length, 0), file_size - 1)
+
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        if start >= file_size:
+            raise ValueError("Range starts beyond end of file")
+        end = min(int(last), file_size - 1) if last else file_size - 1
+        return (start, end)
+
+    @staticmethod
+    def _iter_file_range(file, start: int, length: int):
+        """Yield ``length`` bytes of ``file`` from ``start``, closing it when done."""
+        with file:
+            file.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = file.read(min(RANGE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
 
 @require_http_methods(["GET", "HEAD"])
 def secure_media_file(request, file_path: str) -> HttpResponse:
@@ -908,6 +908,13 @@ def refresh_media_storage_usage_task(media_id):
     return True
 
 
+@task(name="backfill_encoding_filename", queue="short_tasks")
+def backfill_encoding_filename(encoding_id, filename):
+    """Populate Encoding.filename found by the secure media fallback lookup, off the request path."""
+    Encoding.objects.filter(id=encoding_id, filename="").update(filename=filename)
+    return True
+
+
 @task(name="check_running_states", queue="short_tasks")
 def check_running_states():
     encodings = Encoding.objects.filter(status="running")
@@ -0,0 +1,37 @@
+"""
+Tests for the legacy plumi (Members/) URL routes.
+"""
+
+from django.test import SimpleTestCase
+from django.urls import Resolver404, resolve, reverse
+
+from files import views
+
+
+class LegacyPlumiUrlTests(SimpleTestCase):
+    """Old plumi video links resolve to the matching view with user and video captured."""
+
+    def assert_resolves(self, path, view):
+        match = resolve(path)
+        self.assertIs(match.func, view)
+        self.assertEqual(match.kwargs, {"user": "some.user@x", "video": "my-video"})
+
+    def test_video_page_variants_resolve_to_view_old_media(self):
+        for suffix in ("", "/", "/view"):
+            with self.subTest(suffix=suffix):
+                self.assert_resolves(f"/Members/some.user@x/videos/my-video{suffix}", views.view_old_media)
+
+    def test_get_old_media_reverses_to_view_form(self):
+        self.assertEqual(reverse("get_old_media", kwargs={"user": "a", "video": "b"}), "/Members/a/videos/b/view")
+
+    def test_embed_view_resolves_to_embed_old_media(self):
+        self.assert_resolves("/Members/some.user@x/videos/my-video/embed_view", views.embed_old_media)
+
+    def test_other_suffixes_do_not_resolve_to_legacy_views(self):
+        for path in ("/Members/some.user@x/videos/my-video/edit", "/Members/some.user@x/videos/my-video//"):
+            with self.subTest(path=path):
+                try:
+                    match = resolve(path)
+                except Resolver404:
+                    continue
+                self.assertNotIn(match.func, (views.view_old_media, views.embed_old_media))
@@ -1,111 +1,142 @@
 """
 Tests for data migrations to ensure data integrity during schema changes.
+
+The two classes share no rows and create_test_user gives every user a unique
+username, so they can run in separate workers against cloned test databases:
+
+    python manage.py test files.tests.test_migrations --parallel=2
 """
 
+import importlib
+import io
+from contextlib import redirect_stdout
+
+from django.apps import apps
 from django.contrib.auth import get_user_model
 from django.db import connection
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase
 
 from files.models import Media
 from files.tests.helpers import create_test_media, create_test_user
 
 User = get_user_model()
 
+VALID_MEDIA_STATES = frozenset({"private", "public", "unlisted", "restricted"})
+
+fix_invalid_state_and_country = importlib.import_module("files.migrations.0008_fix_invalid_state_and_country")
+
 
 class TestMediaStateMigration(TestCase):
     """
     Test the migration logic that converts 'private_verified' state to 'private'.
 
-    Uses create_test_media helper (which patches media_init) then sets
-    invalid state via raw SQL UPDATE to simulate pre-migration data.
+    The media rows are created once for the class with the create_test_media
+    helper (which patches media_init); each test then sets the invalid state
+    via a single raw SQL UPDATE to simulate pre-migration data, and the
+    per-test transaction rolls it back.
     """
 
+    @classmethod
+    def setUpTestData(cls):
+        # Nothing here authenticates; an unusable password skips the PBKDF2 hasher
+        cls.user = create_test_user(password=None)
+        cls.media_ids = [create_test_media(cls.user, state="public").id for _ in range(5)]
+
     def setUp(self):
-        self.user = create_test_user()
+        # One cursor per test, shared by the raw SQL helpers below
+        self.cursor = connection.cursor()
+        self.addCleanup(self.cursor.close)
 
-    def _set_state_raw(self, media_id, state):
-        with connection.cursor() as cursor:
-            cursor.execute("UPDATE files_media SET state = %s WHERE id = %s", [state, media_id])
+    def _set_state_raw(self, media_ids, state):
+        self.cursor.execute("UPDATE files_media SET state = %s WHERE id = ANY(%s)", [state, list(media_ids)])
 
     def _get_state_raw(self, media_id):
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT state FROM files_media WHERE id = %s", [media_id])
-            return cursor.fetchone()[0]
+        return self._fetch_states([media_id])[media_id]
+
+    def _fetch_states(self, media_ids):
+        """Read the raw state of several media rows in one query, keyed by id."""
+        self.cursor.execute("SELECT id, state FROM files_media WHERE id = ANY(%s)", [list(media_ids)])
+        return dict(self.cursor.fetchall())
 
     def _run_state_migration(self):
-        """Run the fix_invalid_state_values migration logic."""
-        return Media.objects.filter(state="private_verified").update(state="private")
+        """Run the migration's fix_invalid_state_values against the current schema; returns its report."""
+        output = io.StringIO()
+        with redirect_stdout(output):
+            fix_invalid_state_and_country.fix_invalid_state_values(apps, None)
+        return output.getvalue()
 
     def test_private_verified_state_migration(self):
         """Test that 'private_verified' state is migrated to 'private'."""
-        media = create_test_media(self.user, state="public")
-        self._set_state_raw(media.id, "private_verified")
-        self.assertEqual(self._get_state_raw(media.id), "private_verified")
+        media_id = self.media_ids[0]
+        self._set_state_raw([media_id], "private_verified")
 
-        updated = self._run_state_migration()
-        self.assertEqual(updated, 1)
-        self.assertEqual(self._get_state_raw(media.id), "private")
+        report = self._run_state_migration()
+        self.assertIn("Fixed 1 Media record(s)", report)
+        self.assertEqual(self._get_state_raw(media_id), "private")
 
     def test_existing_private_state_unchanged(self):
         """Test that records already in 'private' state remain unchanged."""
-        media = create_test_media(self.user, state="private")
+        media_id = self.media_ids[0]
+        self._set_state_raw([media_id], "private")
         self._run_state_migration()
-        self.assertEqual(self._get_state_raw(media.id), "private")
+        self.assertEqual(self._get_state_raw(media_id), "private")
 
     def test_other_states_unchanged(self):
         """Test that records with other valid states remain unchanged."""
-        states_to_test = ["public", "unlisted", "restricted"]
-        media_list = [(create_test_media(self.user, state=s), s) for s in states_to_test]
+        media_states = list(zip(self.media_ids[:3], ["public", "unlisted", "restricted"], strict=True))
+        for media_id, state in media_states:
+            self._set_state_raw([media_id], state)
 
         self._run_state_migration()
 
-        for media, expected_state in media_list:
+        states = self._fetch_states(media_id for media_id, _ in media_states)
+        for media_id, expected_state in media_states:
             self.assertEqual(
-                self._get_state_raw(media.id),
+                states[media_id],
                 expected_state,
-                f"State for media {media.id} should remain {expected_state}",
+                f"State for media {media_id} should remain {expected_state}",
             )
 
     def test_migration_count_reporting(self):
         """Test that the migration correctly updates multiple records."""
-        media_list = [create_test_media(self.user, state="public") for _ in range(5)]
+        self._set_state_raw(self.media_ids[:3], "private_verified")
 
-        for media in media_list[:3]:
-            self._set_state_raw(media.id, "private_verified")
+        report = self._run_state_migration()
+        self.assertIn("Fixed 3 Media record(s)", report)
 
-        updated = self._run_state_migration()
-        self.assertEqual(updated, 3)
+        states = self._fetch_states(self.media_ids)
+        for media_id in self.media_ids[:3]:
+            self.assertEqual(states[media_id], "private")
 
-        for media in media_list[:3]:
-            self.assertEqual(self._get_state_raw(media.id), "private")
+        for media_id in self.media_ids[3:]:
+            self.assertEqual(states[media_id], "public")
 
-        for media in media_list[3:]:
-            self.assertEqual(self._get_state_raw(media.id), "public")
 
-
-class TestMediaStateFieldConstraints(TestCase):
+class TestMediaStateFieldConstraints(SimpleTestCase):
     """
     Test that the Media.state field has correct constraints after migration.
+
+    Nothing here is saved, so no database access is needed.
     """
 
     def test_state_field_default_is_valid(self):
         """Test that the default value for state field is a valid choice."""
-        user = create_test_user()
-        media = Media(title="Test Media", summary="Test summary", user=user)
+        media = Media(title="Test Media", summary="Test summary", user=User(username="unsaved"))
 
-        valid_states = ["private", "public", "unlisted", "restricted"]
         self.assertIn(
-            media.state, valid_states, f"Default state '{media.state}' is not in valid choices: {valid_states}"
+            media.state,
+            VALID_MEDIA_STATES,
+            f"Default state '{media.state}' is not in valid choices: {sorted(VALID_MEDIA_STATES)}",
         )
 
     def test_invalid_state_raises_validation_error(self):
         """Test that 'private_verified' state is rejected by validation."""
         from django.core.exceptions import ValidationError
 
-        user = create_test_user()
-        media = Media(title="Test Media Invalid", summary="Test summary", user=user, state="private_verified")
+        # Only the state field's own validation, not full_clean() over every Media field
+        state_field = Media._meta.get_field("state")
 
         with self.assertRaises(ValidationError) as context:
-            media.full_clean()
+            state_field.clean("private_verified", None)
 
-        self.assertIn("state", context.exception.message_dict)
+        self.assertEqual(context.exception.code, "invalid_choice")
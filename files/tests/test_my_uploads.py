@@ -334,6 +334,18 @@ class MyUploadsBulkStateTests(TestCase):
         self.assertEqual(self.media_a1.state, "private")
         self.assertEqual(self.media_a2.state, "private")
 
+    def test_bulk_state_change_invalidates_media_path_cache(self):
+        """update() skips post_save, so the secure-serving path cache is cleared explicitly."""
+        with patch("files.management_views.invalidate_media_path_cache") as invalidate:
+            self.client.login(username="usera", password="testpass123")
+            response = self.client.post(
+                "/api/v1/my_uploads/bulk_state",
+                data=json.dumps({"tokens": [self.media_a1.friendly_token], "state": "private"}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 200)
+        invalidate.assert_called_once_with(self.media_a1.id)
+
     def test_cannot_change_state_of_other_users_media(self):
         """User cannot change state of another user's media — count mismatch returns 400."""
         self.client.login(username="usera", password="testpass123")
@@ -3,11 +3,14 @@ Integration tests for the full restricted media flow.
 Tests span multiple units: token issuance → API → file serving → invalidation.
 """
 
+import hashlib
+
 from django.contrib.auth.models import AnonymousUser
 from django.core.cache import cache
 from django.test import Client, RequestFactory, TestCase
 
-from files.secure_media_views import check_media_access_permission
+from files.cache_utils import CACHE_VERSION, get_permission_cache_key
+from files.secure_media_views import check_media_access_permission, user_has_elevated_access
 from files.tests.helpers import create_test_media, create_test_user
 from files.token_utils import generate_token, validate_token
 
@@ -125,6 +128,19 @@ class PasswordChangeInvalidationTest(TestCase):
         self.assertFalse(validate_token(token, self.media_uid))
         self.assertFalse(check_media_access_permission(request, self.media))
 
+    def test_restricted_permission_key_uses_token_digest_directly(self):
+        token = generate_token(self.media_uid)
+        request = RequestFactory().get(f"/media?token={token}")
+        request.user = AnonymousUser()
+        request.session = {}
+
+        self.assertTrue(check_media_access_permission(request, self.media))
+
+        token_hash = hashlib.blake2b(token.encode("utf-8"), digest_size=6).hexdigest()
+        cache_key = get_permission_cache_key("anonymous", self.media.uid, data_hash=token_hash)
+        self.assertTrue(cache_key.endswith(f":{self.media_uid}:{token_hash}"))
+        self.assertIs(cache.get(cache_key, version=CACHE_VERSION), True)
+
 
 class ConcurrentAccessTest(TestCase):
     """Test multiple users with different tokens for same media."""
@@ -167,3 +183,30 @@ class EmbedFlowTest(TestCase):
         # API call with same token
         api_resp = self.client.get(f"/api/v1/media/{self.media.friendly_token}?token={token}")
         self.assertEqual(api_resp.status_code, 200)
+
+
+class ElevatedAccessTest(TestCase):
+    """Owner and role checks are answered from the loaded rows."""
+
+    def setUp(self):
+        self.owner = create_test_user()
+        self.media = create_test_media(self.owner, state="private")
+
+    def test_owner_and_roles_resolved_without_queries(self):
+        editor = create_test_user(is_editor=True)
+        curator = create_test_user(is_curator=True)
+        viewer = create_test_user()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(user_has_elevated_access(self.owner, self.media))
+            self.assertTrue(user_has_elevated_access(editor, self.media))
+            self.assertTrue(user_has_elevated_access(curator, self.media))
+            self.assertFalse(user_has_elevated_access(viewer, self.media))
+            self.assertFalse(user_has_elevated_access(AnonymousUser(), self.media))
+
+    def test_role_change_applies_immediately(self):
+        user = create_test_user()
+        self.assertFalse(user_has_elevated_access(user, self.media))
+
+        user.is_manager = True
+        self.assertTrue(user_has_elevated_access(user, self.media))
@@ -3,8 +3,9 @@ Tests for restricted media views — password entry, token issuance,
 rate limiting, embed auth, and manifest rewriting.
 """
 
-from django.test import Client, TestCase, override_settings
+from django.test import Client, RequestFactory, TestCase, override_settings
 
+from files.secure_media_views import check_media_access_permission
 from files.tests.helpers import create_test_media, create_test_user
 from files.token_utils import _get_brute_force_max_attempts, generate_token
 
@@ -227,3 +228,10 @@ class PublicMediaRegressionTest(TestCase):
         media = create_test_media(self.user, state="public")
         resp = self.client.get(f"/api/v1/media/{media.friendly_token}")
         self.assertEqual(resp.status_code, 200)
+
+    def test_public_and_unlisted_permission_skip_user_resolution(self):
+        # No user or session attached: the state check must not need either
+        request = RequestFactory().get("/media/encoded/1/user/video.mp4")
+        for state in ("public", "unlisted"):
+            media = create_test_media(self.user, state=state)
+            self.assertTrue(check_media_access_permission(request, media))
@@ -10,10 +10,14 @@ that behavior holds for the new layout and stays enforced end-to-end.
 
 import os
 import tempfile
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.test import Client, TestCase, override_settings
 
-from files.secure_media_views import SecureMediaView
+from files import secure_media_views
+from files.models import Media
+from files.secure_media_views import SecureMediaView, get_media_path_cache_key
 from files.tests.helpers import create_test_media, create_test_user
 from files.token_utils import generate_token
 
@@ -47,6 +51,11 @@ class GetMediaFromPathNestedHlsTests(TestCase):
         media, _ = self.view._get_media_from_path(path)
         self.assertIsNone(media)
 
+    def test_non_hex_folder_is_not_a_uid(self):
+        for folder in ("0x12345678", "+1234567", "1234_5678", " 12345678", "abc", "a" * 65):
+            self.assertFalse(self.view._is_valid_uid(folder), folder)
+        self.assertTrue(self.view._is_valid_uid(self.media.uid.hex))
+
 
 class SecureMediaViewNestedHlsAccessTests(TestCase):
     databases = ["default"]
@@ -108,3 +117,144 @@ class SecureMediaViewNestedHlsAccessTests(TestCase):
         response = self.client.get(f"/media/{rel_path}")
 
         self.assertEqual(response.status_code, 403)
+
+    def test_segments_of_same_media_share_one_permission_computation(self):
+        media = create_test_media(self.owner, state="private")
+        first = self._write_manifest(media, "abc123", filename="segment0.ts", content="ts")
+        second = self._write_manifest(media, "abc123", filename="segment1.ts", content="ts")
+        self.client.force_login(self.owner)
+
+        with patch.object(
+            secure_media_views,
+            "_calculate_access_permission",
+            wraps=secure_media_views._calculate_access_permission,
+        ) as calculate:
+            self.assertEqual(self.client.get(f"/media/{first}").status_code, 200)
+            self.assertEqual(self.client.get(f"/media/{second}").status_code, 200)
+
+        self.assertEqual(calculate.call_count, 1)
+
+    def test_direct_serving_honours_byte_ranges(self):
+        media = create_test_media(self.owner, state="public")
+        rel_path = self._write_manifest(media, "abc123", filename="segment0.ts", content="0123456789")
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_RANGE="bytes=2-5")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"2345")
+        self.assertEqual(response["Content-Range"], "bytes 2-5/10")
+        self.assertEqual(response["Content-Length"], "4")
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_RANGE="bytes=-3")
+        self.assertEqual(b"".join(response.streaming_content), b"789")
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_RANGE="bytes=10-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */10")
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_RANGE="bytes=0-1,4-5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+    def test_segments_reuse_media_resolved_for_manifest(self):
+        media = create_test_media(self.owner, state="public")
+        manifest = self._write_manifest(media, "abc123")
+        segment = self._write_manifest(media, "abc123", filename="segment0.ts", content="ts")
+
+        with patch.object(
+            SecureMediaView, "_get_media_from_path", wraps=SecureMediaView()._get_media_from_path
+        ) as lookup:
+            self.assertEqual(self.client.get(f"/media/{manifest}").status_code, 200)
+            self.assertEqual(self.client.get(f"/media/{segment}").status_code, 200)
+
+        self.assertEqual(lookup.call_count, 1)
+
+    def test_public_hls_folder_is_served_from_cache_without_queries(self):
+        media = create_test_media(self.owner, state="public")
+        view = SecureMediaView()
+        view._get_media_from_path_cached(f"hls/{media.uid.hex}/abc123/master.m3u8")
+
+        with self.assertNumQueries(0):
+            found, _ = view._get_media_from_path_cached(f"hls/{media.uid.hex}/abc123/segment7.ts")
+            self.assertEqual(found.friendly_token, media.friendly_token)
+            self.assertEqual(found.uid, media.uid)
+        self.assertEqual(found.pk, media.pk)
+        self.assertEqual(found.state, "public")
+
+        # The cache holds plain column values, never a pickled Media
+        _, _, snapshot_values = cache.get(get_media_path_cache_key(f"hls/{media.uid.hex}/"))
+        self.assertFalse(any(isinstance(value, Media) for value in snapshot_values))
+
+    def test_private_hls_folder_is_refetched_on_cache_hit(self):
+        media = create_test_media(self.owner, state="private")
+        view = SecureMediaView()
+        view._get_media_from_path_cached(f"hls/{media.uid.hex}/abc123/master.m3u8")
+
+        with self.assertNumQueries(1):
+            found, _ = view._get_media_from_path_cached(f"hls/{media.uid.hex}/abc123/segment7.ts")
+        self.assertEqual(found.state, "private")
+
+    def test_direct_serving_head_reports_size_and_404s_directories(self):
+        media = create_test_media(self.owner, state="public")
+        rel_path = self._write_manifest(media, "abc123", filename="segment0.ts", content="0123456789")
+
+        response = self.client.head(f"/media/{rel_path}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], "10")
+
+        response = self.client.get(f"/media/hls/{media.uid.hex}/abc123")
+        self.assertEqual(response.status_code, 404)
+
+    def test_direct_serving_streams_unbuffered_file_with_length(self):
+        media = create_test_media(self.owner, state="public")
+        rel_path = self._write_manifest(media, "abc123", filename="segment0.ts", content="0123456789")
+
+        response = self.client.get(f"/media/{rel_path}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), b"0123456789")
+
+    def test_direct_serving_answers_conditional_requests_with_304(self):
+        media = create_test_media(self.owner, state="public")
+        rel_path = self._write_manifest(media, "abc123", filename="segment0.ts", content="0123456789")
+
+        response = self.client.get(f"/media/{rel_path}")
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(f"/media/{rel_path}", HTTP_IF_NONE_MATCH='W/"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def _cache_control(self, response):
+        return {directive.strip() for directive in response["Cache-Control"].split(",")}
+
+    def test_cache_control_depends_on_path_and_media_state(self):
+        os.makedirs(os.path.join(self.tmpdir.name, "logos"))
+        with open(os.path.join(self.tmpdir.name, "logos", "site.png"), "wb") as f:
+            f.write(b"png")
+        response = self.client.get("/media/logos/site.png")
+        self.assertEqual(self._cache_control(response), {"public", "max-age=604800"})
+
+        public = create_test_media(self.owner, state="public")
+        rel_path = self._write_manifest(public, "abc123", filename="segment0.ts", content="ts")
+        response = self.client.get(f"/media/{rel_path}")
+        self.assertEqual(self._cache_control(response), {"private", "max-age=604800"})
+
+        restricted = create_test_media(self.owner, state="restricted")
+        rel_path = self._write_manifest(restricted, "abc123", filename="segment0.ts", content="ts")
+        token = generate_token(restricted.uid.hex)
+        response = self.client.get(f"/media/{rel_path}?token={token}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._cache_control(response), {"private", "max-age=0"})
+
+        response = self.client.get(f"/media/{rel_path}")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self._cache_control(response), {"no-store"})
@@ -5,14 +5,33 @@ These tests verify that thumbnails and preview GIFs for private/restricted
 media are protected by the same authorization checks as video files.
 """
 
-from unittest.mock import MagicMock, patch
+import os
+from types import SimpleNamespace
+from unittest.mock import patch
 
-from django.test import SimpleTestCase, TestCase
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, SimpleTestCase, TestCase
 
+from files.models import EncodeProfile, Encoding, Media
 from files.secure_media_views import (
+    MAX_MEDIA_PATH_LENGTH,
     PUBLIC_MEDIA_PATHS,
     SecureMediaView,
+    get_cached_media_entry,
+    get_cached_media_id,
+    get_file_extension,
+    invalidate_media_path_cache,
+    set_cached_media_id,
 )
+from files.tests.helpers import create_test_media, create_test_user
+
+
+def media_stub(**file_names):
+    """A stand-in for Media with only the thumbnail fields set, each as an object with .name."""
+    fields = dict.fromkeys(SecureMediaView.THUMBNAIL_FIELDS)
+    fields.update({field: SimpleNamespace(name=name) for field, name in file_names.items()})
+    return SimpleNamespace(**fields)
 
 
 class SecureMediaViewPathTests(SimpleTestCase):
@@ -133,6 +152,39 @@ class SecureMediaViewPathTests(SimpleTestCase):
                 f"Path {path} should NOT bypass authorization (subtitles contain video transcripts)",
             )
 
+    def test_is_non_video_file_does_not_bypass_hls_content(self):
+        """Everything under hls/ is streaming content, whatever its extension."""
+        for path in ("hls/abc123/master.m3u8", "hls/abc123/media-1/key.bin", "hls/abc123/poster.jpg"):
+            self.assertFalse(self.view._is_non_video_file(path), f"Path {path} should NOT bypass authorization")
+
+    def test_is_non_video_file_classifies_by_extension_and_compound_suffix(self):
+        """Video, HLS and compressed video files require authorization; other files bypass it."""
+        for path in ("encoded/1/a/v.MP4", "encoded/1/a/v.m3u8", "hls/abc/x.bin", "encoded/1/a/v.mp4.gz"):
+            self.assertFalse(self.view._is_non_video_file(path), path)
+        for path in ("encoded/1/a/doc.pdf", "original/userlogos/logo.png", "encoded/1/a/archive.tar.gz"):
+            self.assertTrue(self.view._is_non_video_file(path), path)
+
+    def test_get_file_extension_matches_splitext(self):
+        """The rpartition-based extension helper agrees with os.path.splitext."""
+        for path in (
+            "encoded/1/a/v.MP4",
+            "hls/abc.def/segment",
+            "original/user/a/.hidden",
+            "original/user/a/..x",
+            "original/user/a/...a.b",
+            "noext",
+            "dir/trailing.",
+            "archive.tar.gz",
+        ):
+            self.assertEqual(get_file_extension(path), os.path.splitext(path)[1].lower(), path)
+
+    def test_path_classification_with_prefix_tuples(self):
+        """User logos under original/ are public; encoded GIF detection ignores suffix case."""
+        self.assertTrue(self.view._is_public_media_file("original/userlogos/alice.png"))
+        self.assertFalse(self.view._is_public_media_file("original/user/alice/video.mp4"))
+        self.assertTrue(self.view._is_media_associated_file("encoded/1/alice/preview.GIF"))
+        self.assertFalse(self.view._is_media_associated_file("encoded/1/alice/gif"))
+
     def test_is_media_associated_file_for_subtitles(self):
         """Subtitle files should be recognized as media-associated (P2-004 fix)."""
         paths = [
@@ -160,6 +212,51 @@ class SecureMediaViewPathTests(SimpleTestCase):
         for path in paths:
             self.assertTrue(self.view._is_valid_file_path(path), f"Path {path} should be valid")
 
+    def test_is_valid_file_path_rejects_traversal_and_control_characters(self):
+        """Traversal sequences, backslashes, NUL, control characters and DEL are all rejected."""
+        for path in (
+            "encoded/../secret.mp4",
+            "encoded\\22\\video.mp4",
+            "encoded/22/a\x00.mp4",
+            "encoded/22/a\nb.mp4",
+            "encoded/22/a\x7f.mp4",
+            "/encoded/22/video.mp4",
+        ):
+            self.assertFalse(self.view._is_valid_file_path(path), repr(path))
+        self.assertTrue(self.view._is_valid_file_path("encoded/22/alice/v1.2.mp4"))
+
+    def test_is_valid_file_path_rejects_overlong_paths(self):
+        prefix = "encoded/22/alice/"
+        at_limit = prefix + "a" * (MAX_MEDIA_PATH_LENGTH - len(prefix) - 4) + ".mp4"
+        self.assertTrue(self.view._is_valid_file_path(at_limit))
+        self.assertFalse(self.view._is_valid_file_path(prefix + "a" + at_limit[len(prefix) :]))
+
+    def test_bypasses_authorization_only_for_public_and_unassociated_non_video_files(self):
+        """Only paths that need no media lookup skip authorization."""
+        for path in ("userlogos/logo.png", "original/categories/cat.jpg", "other_media/readme.pdf"):
+            self.assertTrue(self.view._bypasses_authorization(path), path)
+        for path in (
+            "original/thumbnails/user/alice/thumb.jpg",
+            "encoded/22/alice/preview.gif",
+            "encoded/22/alice/video.mp4",
+            "hls/abcdef12/master.m3u8",
+        ):
+            self.assertFalse(self.view._bypasses_authorization(path), path)
+
+    def test_path_patterns_extract_segments_like_split(self):
+        """Path patterns pick the same segments split('/') did, and reject short paths."""
+        self.assertEqual(
+            self.view.THUMBNAIL_PATH_PATTERN.match("original/thumbnails/user/alice/thumb.jpg").groups(),
+            ("alice", "thumb.jpg"),
+        )
+        self.assertEqual(
+            self.view.ENCODED_PATH_PATTERN.match("encoded/22/alice/preview.gif/extra").groups(),
+            ("22", "alice", "preview.gif"),
+        )
+        self.assertEqual(self.view.HLS_PATH_PATTERN.match("hls/abc123/media-1/stream.m3u8").group(1), "abc123")
+        self.assertIsNone(self.view.ORIGINAL_PATH_PATTERN.match("original/user/alice"))
+        self.assertIsNone(self.view.HLS_PATH_PATTERN.match("hls/master.m3u8"))
+
 
 class SecureMediaViewVerifyPathTests(SimpleTestCase):
     """Tests for _verify_media_owns_thumbnail_path (P1-001 and P1-002 fixes)."""
@@ -169,61 +266,38 @@ class SecureMediaViewVerifyPathTests(SimpleTestCase):
 
     def test_verify_media_owns_exact_thumbnail_path(self):
         """Media that owns the exact path should verify successfully."""
-        mock_media = MagicMock()
-        mock_media.thumbnail.name = "original/thumbnails/user/alice/thumb.jpg"
-        mock_media.poster.name = "original/thumbnails/user/alice/poster.jpg"
-        mock_media.uploaded_thumbnail = None
-        mock_media.uploaded_poster = None
-        mock_media.sprites = None
+        mock_media = media_stub(
+            thumbnail="original/thumbnails/user/alice/thumb.jpg", poster="original/thumbnails/user/alice/poster.jpg"
+        )
 
         result = self.view._verify_media_owns_thumbnail_path(mock_media, "original/thumbnails/user/alice/thumb.jpg")
         self.assertTrue(result, "Media should verify when it owns the exact path")
 
     def test_verify_media_rejects_suffix_collision(self):
         """Media should NOT verify for a path that's a suffix of its actual path."""
-        mock_media = MagicMock()
         # Media owns "video_thumb.jpg" but request is for "thumb.jpg"
-        mock_media.thumbnail.name = "original/thumbnails/user/alice/video_thumb.jpg"
-        mock_media.poster = None
-        mock_media.uploaded_thumbnail = None
-        mock_media.uploaded_poster = None
-        mock_media.sprites = None
+        mock_media = media_stub(thumbnail="original/thumbnails/user/alice/video_thumb.jpg")
 
         result = self.view._verify_media_owns_thumbnail_path(mock_media, "original/thumbnails/user/alice/thumb.jpg")
         self.assertFalse(result, "Media should NOT verify for suffix collision")
 
     def test_verify_media_rejects_different_user_path(self):
         """Media should NOT verify for a path with different username."""
-        mock_media = MagicMock()
-        mock_media.thumbnail.name = "original/thumbnails/user/alice/thumb.jpg"
-        mock_media.poster = None
-        mock_media.uploaded_thumbnail = None
-        mock_media.uploaded_poster = None
-        mock_media.sprites = None
+        mock_media = media_stub(thumbnail="original/thumbnails/user/alice/thumb.jpg")
 
         result = self.view._verify_media_owns_thumbnail_path(mock_media, "original/thumbnails/user/bob/thumb.jpg")
         self.assertFalse(result, "Media should NOT verify for different user's path")
 
     def test_verify_media_with_no_thumbnails(self):
         """Media with no thumbnails should not verify any path."""
-        mock_media = MagicMock()
-        mock_media.thumbnail = None
-        mock_media.poster = None
-        mock_media.uploaded_thumbnail = None
-        mock_media.uploaded_poster = None
-        mock_media.sprites = None
+        mock_media = media_stub()
 
         result = self.view._verify_media_owns_thumbnail_path(mock_media, "original/thumbnails/user/alice/thumb.jpg")
         self.assertFalse(result, "Media with no thumbnails should not verify")
 
     def test_verify_media_checks_all_thumbnail_fields(self):
         """Verification should check all thumbnail-related fields."""
-        mock_media = MagicMock()
-        mock_media.thumbnail = None
-        mock_media.poster = None
-        mock_media.uploaded_thumbnail = None
-        mock_media.uploaded_poster.name = "original/thumbnails/user/alice/uploaded_poster.jpg"
-        mock_media.sprites = None
+        mock_media = media_stub(uploaded_poster="original/thumbnails/user/alice/uploaded_poster.jpg")
 
         result = self.view._verify_media_owns_thumbnail_path(
             mock_media, "original/thumbnails/user/alice/uploaded_poster.jpg"
@@ -268,6 +342,15 @@ class SecureMediaViewNormalizePathTests(SimpleTestCase):
         self.assertEqual(self.view._normalize_to_relative(""), "")
         self.assertIsNone(self.view._normalize_to_relative(None))
 
+    @patch("files.secure_media_views.settings")
+    def test_normalize_result_follows_media_root_changes(self, mock_settings):
+        """Memoized results are keyed on MEDIA_ROOT, so a changed root is honoured."""
+        path = "/srv/a/original/thumbnails/user/alice/thumb.jpg"
+        mock_settings.MEDIA_ROOT = "/srv/a/"
+        self.assertEqual(self.view._normalize_to_relative(path), "original/thumbnails/user/alice/thumb.jpg")
+        mock_settings.MEDIA_ROOT = "/srv/b/"
+        self.assertEqual(self.view._normalize_to_relative(path), path)
+
     @patch("files.secure_media_views.settings")
     def test_normalize_ignores_different_absolute_prefix(self, mock_settings):
         """Absolute paths with a different prefix should be returned unchanged."""
@@ -280,14 +363,9 @@ class SecureMediaViewNormalizePathTests(SimpleTestCase):
     def test_verify_media_owns_absolute_thumbnail_path(self, mock_settings):
         """Verification should succeed when DB stores absolute paths but request uses relative."""
         mock_settings.MEDIA_ROOT = "/home/cinemata/cinematacms/media_files/"
-        mock_media = MagicMock()
-        mock_media.uploaded_thumbnail.name = (
-            "/home/cinemata/cinematacms/media_files/original/thumbnails/user/emnews/Dagami_Daytoy_Yn9w2nl.jpg"
+        mock_media = media_stub(
+            uploaded_thumbnail="/home/cinemata/cinematacms/media_files/original/thumbnails/user/emnews/Dagami_Daytoy_Yn9w2nl.jpg"
         )
-        mock_media.thumbnail = None
-        mock_media.poster = None
-        mock_media.uploaded_poster = None
-        mock_media.sprites = None
 
         result = self.view._verify_media_owns_thumbnail_path(
             mock_media, "original/thumbnails/user/emnews/Dagami_Daytoy_Yn9w2nl.jpg"
@@ -317,3 +395,259 @@ class SecureMediaViewGetMediaFromPathTests(TestCase):
         """When no encoding matches the GIF path, return None."""
         media, _ = self.view._get_media_from_path("encoded/22/testuser/nonexistent.gif")
         self.assertIsNone(media)
+
+    def test_get_media_from_thumbnail_path_loads_serving_fields_in_one_query(self):
+        """The exact thumbnail lookup is one query and leaves nothing deferred that serving reads."""
+        owner = create_test_user()
+        media = create_test_media(owner, state="private")
+        thumbnail = f"original/thumbnails/user/{owner.username}/exact.jpg"
+        Media.objects.filter(pk=media.pk).update(thumbnail=thumbnail)
+
+        with self.assertNumQueries(1):
+            found, _ = self.view._get_media_from_path(thumbnail)
+            _ = (found.state, found.uid_hex, found.friendly_token, found.user_id, found.thumbnail)
+        self.assertEqual(found, media)
+
+    def _create_encoding(self, media, media_file):
+        profile = EncodeProfile.objects.create(name="h264_test", extension="mp4", codec="h264", resolution=720)
+        encoding = Encoding.objects.create(media=media, profile=profile)
+        Encoding.objects.filter(pk=encoding.pk).update(media_file=media_file, filename=media_file.rsplit("/", 1)[-1])
+        return profile
+
+    def test_get_media_from_encoded_path_after_ownership_transfer_in_one_query(self):
+        """A transferred encoding resolves to its stored path with a single lookup query."""
+        new_owner = create_test_user()
+        media = create_test_media(new_owner, state="private")
+        stored_path = f"encoded/1/{new_owner.username}/transfer.mp4"
+        profile = self._create_encoding(media, stored_path)
+
+        with self.assertNumQueries(1):
+            found, actual_path = self.view._get_media_from_path(f"encoded/{profile.id}/previous_owner/transfer.mp4")
+        self.assertEqual(found, media)
+        self.assertEqual(actual_path, stored_path)
+
+    def test_cached_encoded_path_keeps_actual_path_until_encoding_changes(self):
+        """Cache hits keep the ownership-transfer path override; saving the encoding drops the entry."""
+        new_owner = create_test_user()
+        media = create_test_media(new_owner, state="private")
+        stored_path = f"encoded/1/{new_owner.username}/cached.mp4"
+        profile = self._create_encoding(media, stored_path)
+        requested_path = f"encoded/{profile.id}/previous_owner/cached.mp4"
+
+        self.view._get_media_from_path_cached(requested_path)
+        self.assertEqual(get_cached_media_entry(requested_path), (media.id, stored_path, None))
+        found, actual_path = self.view._get_media_from_path_cached(requested_path)
+        self.assertEqual(found, media)
+        self.assertEqual(actual_path, stored_path)
+
+        encoding = Encoding.objects.get(media=media)
+        encoding.media_file = f"encoded/1/{new_owner.username}/renamed.mp4"
+        encoding.save(update_fields=["media_file"])
+        self.assertIsNone(get_cached_media_id(requested_path))
+
+    def test_get_media_from_encoded_path_matches_unbackfilled_file_suffix(self):
+        """Encodings without a filename resolve through the reversed media_file index and get backfilled."""
+        owner = create_test_user()
+        media = create_test_media(owner, state="private")
+        profile = self._create_encoding(media, f"encoded/1/{owner.username}/legacy.mp4")
+        Encoding.objects.filter(media=media).update(filename="")
+
+        found, actual_path = self.view._get_media_from_path(f"encoded/{profile.id}/{owner.username}/legacy.mp4")
+        self.assertEqual(found, media)
+        self.assertIsNone(actual_path)
+        self.assertEqual(Encoding.objects.get(media=media).filename, "legacy.mp4")
+
+    def test_get_media_from_encoded_path_prefers_username_match(self):
+        """An encoding owned by the user named in the path wins over a same-named transferred one."""
+        other_owner = create_test_user()
+        owner = create_test_user()
+        self._create_encoding(create_test_media(other_owner, state="private"), "encoded/1/x/shared.mp4")
+        media = create_test_media(owner, state="private")
+        self._create_encoding(media, f"encoded/1/{owner.username}/shared.mp4")
+
+        # A non-numeric profile segment matches across both profiles
+        found, actual_path = self.view._get_media_from_path(f"encoded/x/{owner.username}/shared.mp4")
+        self.assertEqual(found, media)
+        self.assertIsNone(actual_path)
+
+    def test_get_media_from_original_path_matches_stored_media_file_exactly(self):
+        """Media without a filename resolve by exact media_file match and get backfilled."""
+        owner = create_test_user()
+        media = create_test_media(owner, state="private")
+        stored_path = f"original/user/{owner.username}/{media.uid.hex}.legacy.mp4"
+        Media.objects.filter(pk=media.pk).update(media_file=stored_path, filename="")
+
+        found, actual_path = self.view._get_media_from_path(stored_path)
+        self.assertEqual(found, media)
+        self.assertIsNone(actual_path)
+        self.assertEqual(Media.objects.get(pk=media.pk).filename, f"{media.uid.hex}.legacy.mp4")
+
+    def test_get_media_from_thumbnail_path_after_ownership_transfer(self):
+        """A transferred media still resolves via the verified filename fallback."""
+        new_owner = create_test_user()
+        media = create_test_media(new_owner, state="private")
+        thumbnail_path = "original/thumbnails/user/previous_owner/transfer_thumb.jpg"
+        Media.objects.filter(pk=media.pk).update(thumbnail=thumbnail_path)
+
+        found, actual_path = self.view._get_media_from_path(thumbnail_path)
+        self.assertEqual(found, media)
+        self.assertIsNone(actual_path)
+
+    def test_get_media_from_thumbnail_path_rejects_suffix_only_match(self):
+        """A filename that only matches as a suffix must not resolve (fail closed)."""
+        owner = create_test_user()
+        media = create_test_media(owner, state="private")
+        Media.objects.filter(pk=media.pk).update(thumbnail="original/thumbnails/user/someone/video_thumb.jpg")
+
+        found, _ = self.view._get_media_from_path("original/thumbnails/user/someone/thumb.jpg")
+        self.assertIsNone(found)
+
+    def test_fetch_media_light_loads_serving_fields_in_one_query(self):
+        """The cache-hit fetch must not trigger deferred-field or owner-join queries."""
+        owner = create_test_user()
+        media = create_test_media(owner, state="private")
+
+        with self.assertNumQueries(1):
+            fetched = self.view._fetch_media_light(media.id)
+            _ = (fetched.state, fetched.uid_hex, fetched.friendly_token, fetched.user_id, fetched.thumbnail)
+
+    def test_fetch_media_light_folds_encoded_gif_check_into_fetch(self):
+        """Verifying an encoded GIF on a cache hit must not issue a separate Encoding query."""
+        owner = create_test_user()
+        media = create_test_media(owner, state="private")
+        gif_path = f"encoded/1/{owner.username}/not-this-media.gif"
+
+        with self.assertNumQueries(1):
+            fetched = self.view._fetch_media_light(media.id, encoded_gif_path=gif_path)
+            self.assertFalse(self.view._verify_media_owns_thumbnail_path(fetched, gif_path))
+
+
+class SecureMediaAuthorizePathsTests(TestCase):
+    """Tests for authorizing many media paths at once."""
+
+    databases = ["default"]
+
+    def setUp(self):
+        self.view = SecureMediaView()
+        self.owner = create_test_user()
+
+    def _media_with_thumbnail(self, state, name):
+        media = create_test_media(self.owner, state=state)
+        thumbnail = f"original/thumbnails/user/{self.owner.username}/{name}.jpg"
+        Media.objects.filter(pk=media.pk).update(thumbnail=thumbnail)
+        return thumbnail
+
+    def _authorize(self, paths, user=None):
+        request = RequestFactory().get("/")
+        request.user = user or AnonymousUser()
+        return self.view._authorize_paths(request, paths)
+
+    def test_public_thumbnails_are_resolved_in_one_query(self):
+        """Thumbnails of several media are looked up together, not one query per path."""
+        thumbnails = [self._media_with_thumbnail("public", f"thumb{i}") for i in range(3)]
+
+        with self.assertNumQueries(1):
+            results = self._authorize(thumbnails)
+
+        self.assertEqual(results, dict.fromkeys(thumbnails, True))
+
+    def test_private_thumbnails_are_only_allowed_for_the_owner(self):
+        public_thumb = self._media_with_thumbnail("public", "shown")
+        private_thumb = self._media_with_thumbnail("private", "hidden")
+        paths = [public_thumb, private_thumb, "logos/site.png", "../etc/passwd"]
+
+        self.assertEqual(
+            self._authorize(paths),
+            {public_thumb: True, private_thumb: False, "logos/site.png": True, "../etc/passwd": False},
+        )
+        self.assertEqual(self._authorize([private_thumb], user=self.owner), {private_thumb: True})
+
+    def test_shared_thumbnail_name_prefers_owner_named_in_path(self):
+        """Like the single-path lookup, the media owned by the user in the path decides access."""
+        other_owner = create_test_user()
+        thumbnail = f"original/thumbnails/user/{self.owner.username}/shared.jpg"
+        # The older media belongs to someone else and is public; the path names the private media's owner
+        public_media = create_test_media(other_owner, state="public")
+        private_media = create_test_media(self.owner, state="private")
+        Media.objects.filter(pk__in=[public_media.pk, private_media.pk]).update(thumbnail=thumbnail)
+
+        self.assertEqual(self._authorize([thumbnail]), {thumbnail: False})
+        self.assertEqual(self.client.get(f"/media/{thumbnail}").status_code, 403)
+
+    def test_legacy_absolute_thumbnail_name_is_resolved(self):
+        media = create_test_media(self.owner, state="public")
+        thumbnail = f"original/thumbnails/user/{self.owner.username}/legacy.jpg"
+        Media.objects.filter(pk=media.pk).update(thumbnail=os.path.join(settings.MEDIA_ROOT, thumbnail))
+
+        self.assertEqual(self._authorize([thumbnail]), {thumbnail: True})
+
+    def test_non_thumbnail_media_paths_are_not_looked_up(self):
+        """Paths needing the per-path lookup are never resolved, so a call costs at most one query."""
+        media = create_test_media(self.owner, state="public")
+        paths = [f"hls/{media.uid.hex}/master.m3u8", f"encoded/1/{self.owner.username}/video.mp4"]
+
+        with self.assertNumQueries(0):
+            results = self._authorize(paths)
+
+        self.assertEqual(results, dict.fromkeys(paths, False))
+
+    def test_unknown_thumbnail_is_denied(self):
+        path = f"original/thumbnails/user/{self.owner.username}/missing.jpg"
+        self.assertEqual(self._authorize([path]), {path: False})
+
+
+class MediaPathCacheInvalidationTests(SimpleTestCase):
+    """Tests for clearing the file path → media ID cache through the reverse mapping."""
+
+    def test_invalidate_removes_every_path_across_batches(self):
+        media_id = 987654321
+        paths = [f"encoded/{i}/alice/video.mp4" for i in range(7)]
+        for path in paths:
+            set_cached_media_id(path, media_id)
+
+        with patch("files.secure_media_views.MEDIA_PATH_INVALIDATION_BATCH_SIZE", 3):
+            deleted = invalidate_media_path_cache(media_id)
+
+        self.assertEqual(deleted, len(paths))
+        for path in paths:
+            self.assertIsNone(get_cached_media_id(path))
+        self.assertEqual(invalidate_media_path_cache(media_id), 0)
+
+
+class SecureMediaViewServeHeadersTests(SimpleTestCase):
+    """Tests for the headers emitted when handing a file off to Nginx."""
+
+    def setUp(self):
+        self.view = SecureMediaView()
+
+    def test_xaccel_video_response_headers(self):
+        response = self.view._serve_file_via_xaccel("encoded/22/alice/video.mp4")
+        self.assertEqual(response["X-Accel-Redirect"], "/internal/media/encoded/22/alice/video.mp4")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["X-Accel-Buffering"], "no")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertEqual(response["Content-Security-Policy"], "default-src 'self'; media-src 'self'")
+        self.assertEqual(response["Content-Disposition"], "inline")
+
+    def test_xaccel_image_response_headers(self):
+        response = self.view._serve_file_via_xaccel("original/thumbnails/user/alice/my thumb.jpg")
+        self.assertEqual(response["X-Accel-Redirect"], "/internal/media/original/thumbnails/user/alice/my%20thumb.jpg")
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["X-Accel-Buffering"], "yes")
+        self.assertEqual(response["Content-Security-Policy"], "default-src 'self'; img-src 'self'")
+
+    def test_xaccel_unknown_extension_defaults(self):
+        response = self.view._serve_file_via_xaccel("other_media/file.bin")
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+        self.assertNotIn("Content-Security-Policy", response)
+
+    def test_content_type_and_headers_resolved_per_extension(self):
+        """Paths sharing an extension (any case) reuse the same resolution."""
+        first = self.view._get_content_type_and_headers("encoded/22/alice/a.mp4")
+        second = self.view._get_content_type_and_headers("encoded/7/bob/B.MP4")
+        self.assertIs(first, second)
+        self.assertEqual(first[0], "video/mp4")
+        # Serving must not leak per-response headers into the shared dict
+        self.view._serve_file_via_xaccel("encoded/22/alice/a.mp4")
+        self.assertNotIn("X-Accel-Redirect", first[1])
@@ -3,6 +3,119 @@ from django.urls import include, path, re_path
 from . import management_views, secure_media_views, tinymce_handlers, views
 from .feeds import IndexRSSFeed, SearchRSSFeed
 
+# API VIEWS
+# Grouped under a single api/v1/ include so non-API requests are rejected by one
+# prefix check instead of being tried against every API pattern. Routes are
+# relative to api/v1/; a miss here falls through to the other apps' api/v1/ routes.
+api_urlpatterns = [
+    path("media", views.MediaList.as_view()),
+    path("media/", views.MediaList.as_view()),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)$",
+        views.MediaDetail.as_view(),
+        name="api_get_media",
+    ),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/abandon$",
+        views.MediaAbandon.as_view(),
+        name="api_abandon_media",
+    ),
+    re_path(
+        r"^media/encoding/(?P<encoding_id>[\w]*)$",
+        views.EncodingDetail.as_view(),
+        name="api_get_encoding",
+    ),
+    path("search", views.MediaSearch.as_view()),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/actions$",
+        views.MediaActions.as_view(),
+    ),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/password$",
+        views.MediaPasswordView.as_view(),
+        name="api_media_password",
+    ),
+    #    url(r'^api/v1/media/(?P<friendly_token>[\w]*)/subtitless$',
+    #        views.MediaSubtitles.as_view()),
+    path("categories", views.CategoryList.as_view()),
+    path("topics", views.TopicList.as_view()),
+    path("content-sensitivities", views.ContentSensitivityList.as_view()),
+    path("languages", views.MediaLanguageList.as_view()),
+    path("countries", views.MediaCountryList.as_view()),
+    path("tags", views.TagList.as_view()),
+    path("subtitle-languages", views.SubtitleLanguageList.as_view()),
+    path("comments", views.CommentList.as_view()),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/comments$",
+        views.CommentDetail.as_view(),
+    ),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/comments/(?P<uid>[\w]+(-[\w]+)*)$",
+        views.CommentDetail.as_view(),
+    ),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/private-journal$",
+        views.PrivateJournalNoteDetail.as_view(),
+    ),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/private-journal/(?P<uid>[\w]+(-[\w]+)*)$",
+        views.PrivateJournalNoteDetail.as_view(),
+    ),
+    re_path(
+        r"^media/(?P<friendly_token>[\w]+(-[\w]+)*)/community-impacts$",
+        views.CommunityImpactList.as_view(),
+    ),
+    path("playlists", views.PlaylistList.as_view()),
+    path("playlists/", views.PlaylistList.as_view()),
+    re_path(
+        r"^playlists/(?P<friendly_token>[\w]+(-[\w]+)*)$",
+        views.PlaylistDetail.as_view(),
+        name="api_get_playlist",
+    ),
+    re_path(r"^user/action/(?P<action>[\w]*)$", views.UserActions.as_view()),
+    re_path(
+        r"^keys/(?P<friendly_token>[\w]+(-[\w]+)*)/?$",
+        views.MediaKeyView.as_view(),
+        name="api_get_media_key",
+    ),
+    # ADMIN VIEWS
+    path("manage_media", management_views.MediaList.as_view()),
+    path("manage_comments", management_views.CommentList.as_view()),
+    path("manage_film_impact", management_views.CommunityImpactList.as_view()),
+    path("manage_film_impact/<uuid:uid>", management_views.CommunityImpactDetail.as_view()),
+    path("manage_users", management_views.UserList.as_view()),
+    # USER MANAGE UPLOADS
+    path("my_uploads", management_views.MyUploadsList.as_view()),
+    path("my_uploads/bulk_state", management_views.MyUploadsBulkState.as_view()),
+    path("my_uploads/upload_options", management_views.BulkUploadOptions.as_view()),
+    path("encode_profiles/", views.EncodeProfileList.as_view()),
+    path("tasks", views.TasksList.as_view()),
+    path("tasks/", views.TasksList.as_view()),
+    re_path(r"^tasks/(?P<friendly_token>[\w|\W]*)$", views.TaskDetail.as_view()),
+    path("topmessage", views.TopMessageList.as_view()),
+    path("indexfeatured", views.IndexPageFeaturedList.as_view()),
+    path("homepagepopup", views.HomepagePopupList.as_view()),
+]
+
+################################
+# These are URLs related with the migration of plumi (plumi.org) systems...
+# Routes are relative to Members/. The bare and trailing-slash forms of a video
+# page share one pattern; the /view form keeps its own so get_old_media reverses.
+legacy_plumi_urlpatterns = [
+    re_path(r"^(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)/?$", views.view_old_media),
+    re_path(
+        r"^(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)/view$",
+        views.view_old_media,
+        name="get_old_media",
+    ),
+    re_path(
+        r"^(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)/embed_view",
+        views.embed_old_media,
+        name="embed_old_media",
+    ),
+]
+################################
+
 urlpatterns = [
     # SECURE MEDIA FILE SERVING
     path(
@@ -50,126 +163,20 @@ urlpatterns = [
         views.view_playlist,
         name="get_playlist",
     ),
-    # API VIEWS
-    path("api/v1/media", views.MediaList.as_view()),
-    path("api/v1/media/", views.MediaList.as_view()),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)$",
-        views.MediaDetail.as_view(),
-        name="api_get_media",
-    ),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/abandon$",
-        views.MediaAbandon.as_view(),
-        name="api_abandon_media",
-    ),
-    re_path(
-        r"^api/v1/media/encoding/(?P<encoding_id>[\w]*)$",
-        views.EncodingDetail.as_view(),
-        name="api_get_encoding",
-    ),
-    path("api/v1/search", views.MediaSearch.as_view()),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/actions$",
-        views.MediaActions.as_view(),
-    ),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/password$",
-        views.MediaPasswordView.as_view(),
-        name="api_media_password",
-    ),
-    #    url(r'^api/v1/media/(?P<friendly_token>[\w]*)/subtitless$',
-    #        views.MediaSubtitles.as_view()),
-    path("api/v1/categories", views.CategoryList.as_view()),
-    path("api/v1/topics", views.TopicList.as_view()),
-    path("api/v1/content-sensitivities", views.ContentSensitivityList.as_view()),
-    path("api/v1/languages", views.MediaLanguageList.as_view()),
-    path("api/v1/countries", views.MediaCountryList.as_view()),
-    path("api/v1/tags", views.TagList.as_view()),
-    path("api/v1/subtitle-languages", views.SubtitleLanguageList.as_view()),
-    path("api/v1/comments", views.CommentList.as_view()),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/comments$",
-        views.CommentDetail.as_view(),
-    ),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/comments/(?P<uid>[\w]+(-[\w]+)*)$",
-        views.CommentDetail.as_view(),
-    ),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/private-journal$",
-        views.PrivateJournalNoteDetail.as_view(),
-    ),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/private-journal/(?P<uid>[\w]+(-[\w]+)*)$",
-        views.PrivateJournalNoteDetail.as_view(),
-    ),
-    re_path(
-        r"^api/v1/media/(?P<friendly_token>[\w]+(-[\w]+)*)/community-impacts$",
-        views.CommunityImpactList.as_view(),
-    ),
-    path("api/v1/playlists", views.PlaylistList.as_view()),
-    path("api/v1/playlists/", views.PlaylistList.as_view()),
-    re_path(
-        r"^api/v1/playlists/(?P<friendly_token>[\w]+(-[\w]+)*)$",
-        views.PlaylistDetail.as_view(),
-        name="api_get_playlist",
-    ),
-    re_path(r"^api/v1/user/action/(?P<action>[\w]*)$", views.UserActions.as_view()),
-    re_path(
-        r"^api/v1/keys/(?P<friendly_token>[\w]+(-[\w]+)*)/?$",
-        views.MediaKeyView.as_view(),
-        name="api_get_media_key",
-    ),
+    # API VIEWS (see api_urlpatterns above)
+    path("api/v1/", include(api_urlpatterns)),
     path("fu/", include(("uploader.urls", "uploader"), namespace="uploader")),
     # TODO: https://site.com/channel/UCwobzUc3z-0PrFpoRxNszXQ channel
     # ADMIN VIEWS
-    path("api/v1/manage_media", management_views.MediaList.as_view()),
-    path("api/v1/manage_comments", management_views.CommentList.as_view()),
-    path("api/v1/manage_film_impact", management_views.CommunityImpactList.as_view()),
-    path("api/v1/manage_film_impact/<uuid:uid>", management_views.CommunityImpactDetail.as_view()),
-    path("api/v1/manage_users", management_views.UserList.as_view()),
     path("manage/users", views.manage_users, name="manage_users"),
     path("manage/media", views.manage_media, name="manage_media"),
     path("manage/comments", views.manage_comments, name="manage_comments"),
     path("manage/film-impact", views.manage_film_impact, name="manage_film_impact"),
     path("manage/film-impact/<uuid:uid>/edit", views.manage_film_impact_edit, name="manage_film_impact_edit"),
     # USER MANAGE UPLOADS
-    path("api/v1/my_uploads", management_views.MyUploadsList.as_view()),
-    path("api/v1/my_uploads/bulk_state", management_views.MyUploadsBulkState.as_view()),
-    path("api/v1/my_uploads/upload_options", management_views.BulkUploadOptions.as_view()),
     path("manage/uploads", views.manage_uploads, name="manage_uploads"),
     path("manage/users/export", views.export_users, name="export_users"),
-    path("api/v1/encode_profiles/", views.EncodeProfileList.as_view()),
-    path("api/v1/tasks", views.TasksList.as_view()),
-    path("api/v1/tasks/", views.TasksList.as_view()),
-    re_path(r"^api/v1/tasks/(?P<friendly_token>[\w|\W]*)$", views.TaskDetail.as_view()),
-    path("api/v1/topmessage", views.TopMessageList.as_view()),
-    path("api/v1/indexfeatured", views.IndexPageFeaturedList.as_view()),
-    path("api/v1/homepagepopup", views.HomepagePopupList.as_view()),
-    ################################
-    # These are URLs related with the migration of plumi (plumi.org) systems...
-    re_path(
-        r"^Members/(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)$",
-        views.view_old_media,
-        name="get_old_media",
-    ),
-    re_path(
-        r"^Members/(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)/$",
-        views.view_old_media,
-        name="get_old_media",
-    ),
-    re_path(
-        r"^Members/(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)/view$",
-        views.view_old_media,
-        name="get_old_media",
-    ),
-    re_path(
-        r"^Members/(?P<user>[\w.@-]*)/videos/(?P<video>[\w.@-]*)/embed_view",
-        views.embed_old_media,
-        name="embed_old_media",
-    ),
-    ################################
+    path("Members/", include(legacy_plumi_urlpatterns)),
     # Modern track demo page (staff-only)
     path("modern-demo", views.modern_demo_page, name="modern_demo"),
     re_path(r"^(?P<slug>[\w.-]*)$", views.view_page, name="get_page"),
@@ -116,6 +116,18 @@ class TestIndexPageFeaturedValidation(TestCase):
         self.assertLess(elapsed, 1.0, "Validation took too long, possible ReDoS")
         self.assertIn('href="/test"', result)
 
+    def test_long_whitespace_runs(self):
+        """Test that whitespace runs of any length before attributes are matched in linear time"""
+        content = "<a" + " " * 9000 + 'href="/test">Link</a>'
+        self.assertIn('href="/test"', validate_internal_html(content))
+
+        with self.assertRaisesMessage(ValidationError, "Dangerous tag not allowed: <svg>"):
+            validate_internal_html("<svg" + " " * 9000 + ">")
+
+        # At most 500 non-whitespace-led characters may precede href
+        with self.assertRaisesMessage(ValidationError, "All <a> tags must have an href attribute"):
+            validate_internal_html("<a" + " " * 600 + "x" * 501 + 'href="/test">Link</a>')
+
     def test_nested_dangerous_content(self):
         """Test that nested dangerous content is blocked"""
         # Content with script tags should be blocked
@@ -207,3 +219,14 @@ class TestIndexPageFeaturedValidation(TestCase):
         content = '<a href="/test">Link &amp; Text</a>'
         result = validate_internal_html(content)
         self.assertIn("Link", result)
+
+    def test_reported_name_follows_list_order(self):
+        """When several blocked names match, the first in each list is the one reported"""
+        with self.assertRaisesMessage(ValidationError, "Dangerous tag not allowed: <script>"):
+            validate_internal_html("<svg></svg><script>alert(1)</script>")
+
+        with self.assertRaisesMessage(ValidationError, "Event handler not allowed: onload"):
+            validate_internal_html('<a href="/test" style="x" onloadstart="a()" onload="b()">Link</a>')
+
+        with self.assertRaisesMessage(ValidationError, "Dangerous attribute not allowed: style"):
+            validate_internal_html('<a href="/test" data-x="1" style="x">Link</a>')
@@ -6,7 +6,7 @@ from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 
 from cms.permissions import is_mfa_enabled_for_user, user_requires_mfa
-from utils.security import generate_cipher, generate_key
+from utils.security import generate_key, get_cipher
 
 from .models import BlackListedEmail
 
@@ -59,4 +59,4 @@ class MyAccountAdapter(DefaultAccountAdapter):
 
     @property
     def cipher_suite(self):
-        return generate_cipher(self.key)
+        return get_cipher()
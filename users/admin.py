@@ -6,6 +6,7 @@ from django.db.models import OuterRef, Subquery
 from .models import BlackListedEmail, User
 
 if apps.is_installed("allauth.mfa"):
+    from allauth.mfa import app_settings as mfa_settings
     from allauth.mfa.models import Authenticator
 else:
     Authenticator = None
@@ -58,7 +59,9 @@ class UserAdmin(admin.ModelAdmin):
         boolean=True,
     )
     def has_mfa_enabled(self, obj):
-        return Authenticator.objects.filter(user=obj).exists()
+        # Read from the mfa_created annotation (created_at is never null) instead of
+        # querying authenticators once per changelist row
+        return obj.mfa_created is not None
 
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
@@ -161,11 +164,6 @@ if Authenticator:
                 # For recovery codes, show count and usage status
                 seed = obj.data.get("seed", None)
                 unused_count = len(obj.wrap().get_unused_codes())
-                total_count = 0
-
-                # Try to determine total recovery code count
-                from allauth.mfa import app_settings as mfa_settings
-
                 total_count = mfa_settings.RECOVERY_CODE_COUNT
 
                 return f"Unused codes: {unused_count}/{total_count}\nSeed: {'[ENCRYPTED]' if seed else 'None'}"
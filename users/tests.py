@@ -9,7 +9,9 @@ from allauth.mfa.totp.internal.auth import (
     validate_totp_code,
     yield_hotp_counters_from_time,
 )
-from django.test import Client, TestCase, override_settings
+from cryptography.fernet import InvalidToken
+from django.contrib import admin
+from django.test import Client, RequestFactory, TestCase, override_settings
 from django.urls import reverse
 
 from .models import User
@@ -280,3 +282,69 @@ class MFATestCase(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, "mfa/totp/success.html")
+
+
+class UserAdminTestCase(TestCase):
+    """Test cases for the user and authenticator admin columns"""
+
+    def test_mfa_columns_come_from_one_query(self):
+        from allauth.mfa.models import Authenticator
+
+        with_mfa = User.objects.create_user(username="with_mfa", email="with@example.com", password="pass12345678")
+        User.objects.create_user(username="without_mfa", email="without@example.com", password="pass12345678")
+        Authenticator.objects.create(user=with_mfa, type=Authenticator.Type.TOTP, data={})
+
+        request = RequestFactory().get("/admin/users/user/")
+        user_admin = admin.site._registry[User]
+
+        with self.assertNumQueries(1):
+            enabled = {user.username: user_admin.has_mfa_enabled(user) for user in user_admin.get_queryset(request)}
+
+        self.assertEqual(enabled, {"with_mfa": True, "without_mfa": False})
+
+    def test_recovery_code_columns_report_counts(self):
+        from allauth.mfa import app_settings as mfa_settings
+        from allauth.mfa.models import Authenticator
+        from allauth.mfa.recovery_codes.internal.auth import RecoveryCodes
+
+        user = User.objects.create_user(username="codes", email="codes@example.com", password="pass12345678")
+        authenticator = RecoveryCodes.activate(user).instance
+        authenticator_admin = admin.site._registry[Authenticator]
+        total = mfa_settings.RECOVERY_CODE_COUNT
+
+        self.assertEqual(authenticator_admin.auth_description(authenticator), f"Recovery Codes ({total} remaining)")
+        self.assertEqual(
+            authenticator_admin.data_masked(authenticator), f"Unused codes: {total}/{total}\nSeed: [ENCRYPTED]"
+        )
+
+
+class AccountAdapterEncryptionTestCase(TestCase):
+    """Test cases for MyAccountAdapter encryption"""
+
+    def test_encrypt_round_trip_reuses_cipher(self):
+        from .adapter import MyAccountAdapter
+
+        adapter = MyAccountAdapter()
+        encrypted = adapter.encrypt("totp-secret")
+
+        self.assertNotEqual(encrypted, "totp-secret")
+        self.assertEqual(MyAccountAdapter().decrypt(encrypted), "totp-secret")
+        self.assertIs(adapter.cipher_suite, MyAccountAdapter().cipher_suite)
+
+    def test_key_is_the_cipher_key(self):
+        from utils.security import generate_cipher
+
+        from .adapter import MyAccountAdapter
+
+        adapter = MyAccountAdapter()
+        self.assertEqual(generate_cipher(adapter.key).decrypt(adapter.encrypt("totp-secret").encode()), b"totp-secret")
+
+    def test_cipher_follows_secret_key(self):
+        from .adapter import MyAccountAdapter
+
+        encrypted = MyAccountAdapter().encrypt("totp-secret")
+        with override_settings(SECRET_KEY="another-secret-key-for-tests"):
+            adapter = MyAccountAdapter()
+            self.assertEqual(adapter.decrypt(adapter.encrypt("totp-secret")), "totp-secret")
+            with self.assertRaises(InvalidToken):
+                adapter.decrypt(encrypted)
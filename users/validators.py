@@ -16,6 +16,113 @@ class ASCIIUsernameValidator(validators.RegexValidator):
 custom_username_validators = [ASCIIUsernameValidator()]
 
 
+# Patterns are compiled once at import; validate_internal_html runs on every save of
+# user-editable HTML and re-resolving ~70 patterns through the re cache adds up.
+# A whitespace run followed by up to 500 non-">" characters is written as "\s+" then an
+# optional non-space start, so the run has only one way to split and long whitespace
+# stays linear instead of being retried 500 times per position (same matches as "\s+[^>]{0,500}").
+INCOMPLETE_TAG_PATTERN = re.compile(r"<\w+(?:\s+(?:[^>\s][^>]{0,499})?)?$")
+LINK_PATTERN = re.compile(r'<a\s+(?:[^>\s][^>]{0,499})?href=["\']([^"\']{1,2000})["\'](?:[^>]{0,500})?>', re.IGNORECASE)
+
+DANGEROUS_TAGS = (
+    "script",
+    "iframe",
+    "object",
+    "embed",
+    "form",
+    "input",
+    "base",
+    "link",
+    "meta",
+    "svg",
+)
+DANGEROUS_TAG_PATTERNS = tuple(
+    (tag, re.compile(f"<{tag}(?:\\s+(?:[^>\\s][^>]{{0,499}})?)?>", re.IGNORECASE)) for tag in DANGEROUS_TAGS
+)
+
+EVENT_HANDLERS = (
+    "onclick",
+    "ondblclick",
+    "onmousedown",
+    "onmouseup",
+    "onmouseover",
+    "onmousemove",
+    "onmouseout",
+    "onmouseenter",
+    "onmouseleave",
+    "onkeydown",
+    "onkeypress",
+    "onkeyup",
+    "onload",
+    "onunload",
+    "onabort",
+    "onerror",
+    "onresize",
+    "onscroll",
+    "onselect",
+    "onchange",
+    "onsubmit",
+    "onreset",
+    "onfocus",
+    "onblur",
+    "oninput",
+    "oninvalid",
+    "onsearch",
+    "oncontextmenu",
+    "oncopy",
+    "oncut",
+    "onpaste",
+    "ondrag",
+    "ondragend",
+    "ondragenter",
+    "ondragleave",
+    "ondragover",
+    "ondragstart",
+    "ondrop",
+    "onloadstart",
+    "onprogress",
+    "onsuspend",
+    "onemptied",
+    "onstalled",
+    "onloadedmetadata",
+    "onloadeddata",
+    "oncanplay",
+    "oncanplaythrough",
+    "onplaying",
+    "onwaiting",
+    "onseeking",
+    "onseeked",
+    "onended",
+    "ondurationchange",
+    "ontimeupdate",
+    "onplay",
+    "onpause",
+    "onratechange",
+    "onvolumechange",
+)
+# Match handler with or without value assignment (boolean attributes)
+# Matches: onclick="..." or onclick='...' or onclick or onclick>
+EVENT_HANDLER_PATTERNS = tuple(
+    (handler, re.compile(f"\\b{handler}(\\s*=|\\s|>)", re.IGNORECASE)) for handler in EVENT_HANDLERS
+)
+
+DANGEROUS_ATTRS = ("style", "formaction", "srcdoc", "data")
+# Match attribute with or without value (boolean attributes)
+DANGEROUS_ATTR_PATTERNS = tuple(
+    (attr, re.compile(f"\\b{attr}(\\s*=|\\s|>)", re.IGNORECASE)) for attr in DANGEROUS_ATTRS
+)
+
+# One scan that matches whenever any pattern in the list would; benign content passes
+# with this single search instead of one per name. On a hit the per-name patterns are
+# checked in list order so the reported name is unchanged.
+ANY_DANGEROUS_TAG_PATTERN = re.compile(
+    f"<(?:{'|'.join(DANGEROUS_TAGS)})(?:\\s+(?:[^>\\s][^>]{{0,499}})?)?>", re.IGNORECASE
+)
+ANY_BLOCKED_ATTR_PATTERN = re.compile(
+    f"\\b(?:{'|'.join(EVENT_HANDLERS + DANGEROUS_ATTRS)})(\\s*=|\\s|>)", re.IGNORECASE
+)
+
+
 def validate_internal_html(value):
     """
     Validates HTML content to allow only safe internal links and basic formatting.
@@ -28,10 +135,9 @@ def validate_internal_html(value):
     if len(value) > MAX_LENGTH:
         raise ValidationError(f"Content too large. Maximum {MAX_LENGTH} characters allowed.")
 
-    if re.search(r"<\w+(?:\s+[^>]{0,500})?$", value.strip()):
+    if INCOMPLETE_TAG_PATTERN.search(value.strip()):
         raise ValidationError("Incomplete HTML tag detected. Please ensure all tags are properly closed.")
-    link_pattern = r'<a\s+(?:[^>]{0,500})?href=["\']([^"\']{1,2000})["\'](?:[^>]{0,500})?>'
-    links = re.findall(link_pattern, value, re.IGNORECASE)
+    links = LINK_PATTERN.findall(value)
 
     if not links and "<a" in value.lower():
         raise ValidationError("All <a> tags must have an href attribute with proper quotes.")
@@ -44,95 +150,20 @@ def validate_internal_html(value):
             )
 
     # Solution 2: Block dangerous HTML tags with bounded repetition
-    dangerous_tags = [
-        "script",
-        "iframe",
-        "object",
-        "embed",
-        "form",
-        "input",
-        "base",
-        "link",
-        "meta",
-        "svg",
-    ]
-    for tag in dangerous_tags:
-        if re.search(f"<{tag}(?:\\s+[^>]{{0,500}})?>", value, re.IGNORECASE):
-            raise ValidationError(f"Dangerous tag not allowed: <{tag}>")
-
-    # Block event handler attributes (with or without values)
-    event_handlers = [
-        "onclick",
-        "ondblclick",
-        "onmousedown",
-        "onmouseup",
-        "onmouseover",
-        "onmousemove",
-        "onmouseout",
-        "onmouseenter",
-        "onmouseleave",
-        "onkeydown",
-        "onkeypress",
-        "onkeyup",
-        "onload",
-        "onunload",
-        "onabort",
-        "onerror",
-        "onresize",
-        "onscroll",
-        "onselect",
-        "onchange",
-        "onsubmit",
-        "onreset",
-        "onfocus",
-        "onblur",
-        "oninput",
-        "oninvalid",
-        "onsearch",
-        "oncontextmenu",
-        "oncopy",
-        "oncut",
-        "onpaste",
-        "ondrag",
-        "ondragend",
-        "ondragenter",
-        "ondragleave",
-        "ondragover",
-        "ondragstart",
-        "ondrop",
-        "onloadstart",
-        "onprogress",
-        "onsuspend",
-        "onemptied",
-        "onstalled",
-        "onloadedmetadata",
-        "onloadeddata",
-        "oncanplay",
-        "oncanplaythrough",
-        "onplaying",
-        "onwaiting",
-        "onseeking",
-        "onseeked",
-        "onended",
-        "ondurationchange",
-        "ontimeupdate",
-        "onplay",
-        "onpause",
-        "onratechange",
-        "onvolumechange",
-    ]
-    for handler in event_handlers:
-        # Match handler with or without value assignment (boolean attributes)
-        # Matches: onclick="..." or onclick='...' or onclick or onclick>
-        if re.search(f"\\b{handler}(\\s*=|\\s|>)", value, re.IGNORECASE):
-            raise ValidationError(f"Event handler not allowed: {handler}")
-
-    # Block dangerous attributes
-    dangerous_attrs = ["style", "formaction", "srcdoc", "data"]
-    for attr in dangerous_attrs:
-        # Match attribute with or without value (boolean attributes)
-        if re.search(f"\\b{attr}(\\s*=|\\s|>)", value, re.IGNORECASE):
-            raise ValidationError(f"Dangerous attribute not allowed: {attr}")
+    if ANY_DANGEROUS_TAG_PATTERN.search(value):
+        for tag, pattern in DANGEROUS_TAG_PATTERNS:
+            if pattern.search(value):
+                raise ValidationError(f"Dangerous tag not allowed: <{tag}>")
+
+    # Block event handler attributes and dangerous attributes (with or without values)
+    if ANY_BLOCKED_ATTR_PATTERN.search(value):
+        for handler, pattern in EVENT_HANDLER_PATTERNS:
+            if pattern.search(value):
+                raise ValidationError(f"Event handler not allowed: {handler}")
+
+        for attr, pattern in DANGEROUS_ATTR_PATTERNS:
+            if pattern.search(value):
+                raise ValidationError(f"Dangerous attribute not allowed: {attr}")
 
     return value
 
@@ -1,16 +1,29 @@
 """Security util methods for general use."""
 
 import base64
+from functools import lru_cache
 from hashlib import sha256
 
 from cryptography.fernet import Fernet
 from django.conf import settings
 
 
-def generate_key():
-    digest = sha256(settings.SECRET_KEY.encode()).digest()
+def generate_key(secret_key=None):
+    if secret_key is None:
+        secret_key = settings.SECRET_KEY
+    digest = sha256(secret_key.encode()).digest()
     return base64.urlsafe_b64encode(digest)
 
 
 def generate_cipher(key):
     return Fernet(key)
+
+
+@lru_cache(maxsize=1)
+def _cipher_for_secret_key(secret_key):
+    return generate_cipher(generate_key(secret_key))
+
+
+def get_cipher():
+    """Fernet cipher for the current SECRET_KEY, built once instead of on every call."""
+    return _cipher_for_secret_key(settings.SECRET_KEY)